@@ -1,13 +1,43 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from starlette.middleware.cors import CORSMiddleware
 from .core import settings
 from app.api import api_router
+from app.core import metrics
+from app.core.absensi import absensi_buffer
+from app.core.admission import admission_controls
+from app.core.idcards import idcard_jobs
+from app.core.media import media_pool
+from app.core.qrcodes import qr_jobs
+from app.core.security import password_hasher
+from app.db.engine import engine, warm_up_pool
+from app.db.migration import verify_schema
+from app.db.pool import get_pool_status
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # NOTE: startup -> schema check & pool warm up happen once, not per request
+    await password_hasher.warm_up()
+    await media_pool.warm_up()
+    await verify_schema(engine)
+    await warm_up_pool(settings.DB_POOL_SIZE)
+    absensi_buffer.start()
+    yield
+    # NOTE: shutdown -> pending attendance scans are written before the pool closes
+    await absensi_buffer.shutdown()
+    await qr_jobs.shutdown()
+    await idcard_jobs.shutdown()
+    await engine.dispose()
+    password_hasher.shutdown()
+    media_pool.shutdown()
 
 
 app = FastAPI(
     title=f"{settings.PROJECT_NAME}",
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     version="0.0.1-pre",
+    lifespan=lifespan,
 )
 
 
@@ -18,6 +48,57 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
     )
 
 app.include_router(api_router, prefix=f"{settings.API_V1_STR}")
+
+
+# NOTE: always on, the request scope also feeds the statement budgets of
+# app.db.diagnostics
+app.add_middleware(metrics.MetricsMiddleware, exclude=["/metrics"])
+
+if settings.METRICS_ENABLED:
+
+    def collect_runtime(lines: list[str]) -> None:
+        metrics.render_gauges(
+            lines,
+            "db_pool",
+            "Connection pool state and checkout counters",
+            [({"stat": k}, v) for k, v in get_pool_status(engine).items()],
+        )
+        metrics.render_gauges(
+            lines,
+            "password_hasher",
+            "Password hashing pool queue",
+            [({"stat": k}, v) for k, v in password_hasher.stats().items()],
+        )
+        metrics.render_gauges(
+            lines,
+            "admission",
+            "Admission control queues and shed requests",
+            [
+                ({"control": name, "stat": k}, v)
+                for name, control in admission_controls.items()
+                for k, v in control.stats().items()
+            ],
+        )
+        metrics.render_gauges(
+            lines,
+            "media_pool",
+            "QR code, ID card & photo rendering pool queue",
+            [({"stat": k}, v) for k, v in media_pool.stats().items()],
+        )
+        metrics.render_gauges(
+            lines,
+            "absensi_buffer",
+            "Attendance write-behind buffer",
+            [({"stat": k}, v) for k, v in absensi_buffer.stats().items()],
+        )
+
+    @app.get("/metrics", include_in_schema=False)
+    async def read_metrics():
+        return Response(
+            metrics.render(collect_runtime),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
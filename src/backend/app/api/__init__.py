@@ -1,10 +1,111 @@
-from fastapi import APIRouter
-from .endpoints_v1 import user_api, login_api, datum_api
+from fastapi import APIRouter, Depends
+from app.core import settings
+from app.core.admission import ConcurrencyLimit, RateLimit, login_client, register
+from .endpoints_v1 import (
+    user_api,
+    login_api,
+    datum_api,
+    admin_api,
+    absensi_api,
+    qrcode_api,
+    idcard_api,
+    media_api,
+)
+
+# NOTE: admission control, hashing & heavy listings can't starve cheap routes
+# like /auth/me which stay unlimited
+login_rate = register(
+    RateLimit(
+        "login-rate",
+        per_minute=settings.LOGIN_RATE_PER_MINUTE,
+        burst=settings.LOGIN_RATE_BURST,
+        routes={"login"},
+        key=login_client,
+    )
+)
+login_ip_rate = register(
+    RateLimit(
+        "login-ip-rate",
+        per_minute=settings.LOGIN_IP_RATE_PER_MINUTE,
+        burst=settings.LOGIN_IP_RATE_BURST,
+        routes={"login"},
+    )
+)
+login_limit = register(
+    ConcurrencyLimit(
+        "login",
+        limit=settings.LOGIN_CONCURRENCY,
+        queue_size=settings.LOGIN_QUEUE_SIZE,
+        timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+        routes={"login"},
+    )
+)
+USERS_EXPORT_ROUTES = {"export_users"}
+USERS_IMPORT_ROUTES = {"import_users", "import_users_file"}
+users_limit = register(
+    ConcurrencyLimit(
+        "users",
+        limit=settings.USERS_CONCURRENCY,
+        queue_size=settings.USERS_QUEUE_SIZE,
+        timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+        exclude=USERS_EXPORT_ROUTES | USERS_IMPORT_ROUTES,
+    )
+)
+users_export_limit = register(
+    ConcurrencyLimit(
+        "users-export",
+        limit=settings.USERS_EXPORT_CONCURRENCY,
+        queue_size=settings.USERS_EXPORT_QUEUE_SIZE,
+        timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+        routes=USERS_EXPORT_ROUTES,
+    )
+)
+users_import_limit = register(
+    ConcurrencyLimit(
+        "users-import",
+        limit=settings.USERS_IMPORT_CONCURRENCY,
+        queue_size=settings.USERS_IMPORT_QUEUE_SIZE,
+        timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+        routes=USERS_IMPORT_ROUTES,
+    )
+)
 
 api_router = APIRouter()
-api_router.include_router(login_api.router, prefix='/auth', tags=["Auth"])
 api_router.include_router(
-    user_api.router, prefix="/users", tags=["Users (Only admins can access this)"]
+    login_api.router,
+    prefix="/auth",
+    tags=["Auth"],
+    dependencies=[
+        Depends(login_ip_rate),
+        Depends(login_rate),
+        Depends(login_limit),
+    ],
+)
+api_router.include_router(
+    user_api.router,
+    prefix="/users",
+    tags=["Users (Only admins can access this)"],
+    dependencies=[
+        Depends(users_limit),
+        Depends(users_export_limit),
+        Depends(users_import_limit),
+    ],
 )
 
 api_router.include_router(datum_api.router, prefix="/data-umum", tags=["Data Umum"])
+api_router.include_router(absensi_api.router, prefix="/absensi", tags=["Absensi"])
+api_router.include_router(
+    qrcode_api.router,
+    prefix="/qr-codes",
+    tags=["QR Code (Only admins can access this)"],
+)
+api_router.include_router(
+    idcard_api.router,
+    prefix="/id-cards",
+    tags=["ID Card (Only admins can access this)"],
+)
+# NOTE: no admission limit, slow uploads must not hold the users slots
+api_router.include_router(media_api.router, prefix="/media", tags=["Media"])
+api_router.include_router(
+    admin_api.router, prefix="/admin", tags=["Admin (Only admins can access this)"]
+)
@@ -0,0 +1,129 @@
+from datetime import datetime, time, timedelta
+from typing import Any, Union
+from uuid import UUID
+from fastapi import APIRouter, Body, Depends, HTTPException
+from app.core import settings
+from app.core.absensi import absensi_buffer, siswa_qr_cache
+from app.core.dependencies import SessionDepends, get_active_scanner
+from app.db.crud import absensi_crud
+from app.db.diagnostics import StatementBudget
+from app.schemas.absensi_schema import ScanResultSchema, ScanSchema
+
+router = APIRouter()
+
+
+# NOTE: QR Scan
+
+
+@router.post(
+    "/scan",
+    status_code=202,
+    response_model=ScanResultSchema,
+    # NOTE: principal + unknown qr codes + the dedupe set of every accepted day
+    dependencies=[
+        Depends(get_active_scanner),
+        Depends(StatementBudget(3 + settings.ABSENSI_SCAN_MAX_AGE_DAYS)),
+    ],
+)
+async def scan_absensi(
+    *,
+    db: SessionDepends,
+    scans: Union[ScanSchema, list[ScanSchema]] = Body(
+        ...,
+        examples=[
+            {"qr": "0b6f3c1e-8d4a-4f1b-9a57-2c9e4d6b7a10"},
+            [
+                {
+                    "qr": "0b6f3c1e-8d4a-4f1b-9a57-2c9e4d6b7a10",
+                    "scanned_at": "2026-10-19T06:45:12",
+                }
+            ],
+        ],
+    ),
+):
+    """
+    **Record one scan or a batch of scans from a gate scanner**
+
+    The first scan of a siswa per day counts, repeats are reported as
+    `duplicates`. QR codes that don't belong to an active siswa and scans
+    dated in the future (beyond `ABSENSI_SCAN_CLOCK_SKEW` seconds) or before
+    the last `ABSENSI_SCAN_MAX_AGE_DAYS` days come back in `rejected`.
+    `results` reports every scan in request order. Scans are buffered and
+    written within `ABSENSI_FLUSH_INTERVAL` seconds, hence **202**.
+    """
+    if isinstance(scans, ScanSchema):
+        scans = [scans]
+    if len(scans) > settings.ABSENSI_SCAN_BATCH_MAX:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.ABSENSI_SCAN_BATCH_MAX} scans per request",
+        )
+    if absensi_buffer.is_full():
+        raise HTTPException(
+            status_code=503,
+            detail="Attendance buffer is full, please retry.",
+            headers={"Retry-After": str(max(int(settings.ABSENSI_FLUSH_INTERVAL), 1))},
+        )
+
+    now = datetime.now()
+    # NOTE: offline scanners send their backlog later, but a client clock must
+    # not move attendance to another day
+    earliest = datetime.combine(
+        now.date() - timedelta(days=settings.ABSENSI_SCAN_MAX_AGE_DAYS), time.min
+    )
+    latest = now + timedelta(seconds=settings.ABSENSI_SCAN_CLOCK_SKEW)
+
+    results: list[dict[str, Any]] = []
+    parsed: list[tuple[int, UUID, datetime]] = []
+    for index, scan in enumerate(scans):
+        result = {"index": index, "qr": scan.qr, "status": "rejected"}
+        results.append(result)
+        try:
+            qr = UUID(scan.qr.strip())
+        except ValueError:
+            result["detail"] = "Unknown QR code"
+            continue
+
+        scanned_at = scan.scanned_at or now
+        if scanned_at.tzinfo is not None:
+            scanned_at = scanned_at.astimezone().replace(tzinfo=None)
+        if scanned_at > latest:
+            result["detail"] = "scanned_at is in the future"
+            continue
+        if scanned_at < earliest:
+            result["detail"] = "scanned_at is too old"
+            continue
+        # within the skew, the scan happened now at the latest
+        parsed.append((index, qr, min(scanned_at, now)))
+
+    user_ids: dict[UUID, int] = {}
+    for _, qr, _ in parsed:
+        user_id = siswa_qr_cache.get(qr)
+        if user_id is not None:
+            user_ids[qr] = user_id
+
+    missing = {qr for _, qr, _ in parsed if qr not in user_ids}
+    if missing:
+        found = await absensi_crud.read_siswa_ids(db, missing)
+        for qr, user_id in found.items():
+            siswa_qr_cache.set(qr, user_id)
+        user_ids.update(found)
+
+    accepted = duplicates = 0
+    for index, qr, scanned_at in parsed:
+        user_id = user_ids.get(qr)
+        if user_id is None:
+            results[index]["detail"] = "Unknown QR code"
+        elif await absensi_buffer.record(user_id, scanned_at):
+            results[index]["status"] = "accepted"
+            accepted += 1
+        else:
+            results[index]["status"] = "duplicate"
+            duplicates += 1
+
+    return {
+        "accepted": accepted,
+        "duplicates": duplicates,
+        "rejected": [item["qr"] for item in results if item["status"] == "rejected"],
+        "results": results,
+    }
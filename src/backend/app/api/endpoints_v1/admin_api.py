@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends
+from app.core.absensi import absensi_buffer, siswa_qr_cache
+from app.core.admission import admission_controls
+from app.core.dependencies import get_active_admin, principal_cache, token_cache
+from app.core.security import password_hasher
+from app.api.endpoints_v1.datum_api import kelas_cache
+from app.db.engine import engine
+from app.db.pool import get_pool_status, pool_stats
+
+router = APIRouter()
+
+
+# NOTE: Database Pool
+
+
+@router.get("/db-pool", dependencies=[Depends(get_active_admin)])
+async def read_db_pool():
+    """
+    **Live connection pool statistics for this worker**
+    """
+    return get_pool_status(engine)
+
+
+@router.delete("/db-pool/stats", dependencies=[Depends(get_active_admin)])
+async def reset_db_pool_stats():
+    pool_stats.reset()
+    return {"msg": "Pool statistics has been reset"}
+
+
+# NOTE: Password Hasher
+
+
+@router.get("/password-hasher", dependencies=[Depends(get_active_admin)])
+async def read_password_hasher():
+    """
+    **Password hashing pool queue depth for this worker**
+    """
+    return password_hasher.stats()
+
+
+# NOTE: In-process Caches
+
+
+@router.get("/caches", dependencies=[Depends(get_active_admin)])
+async def read_caches():
+    return {
+        "token": token_cache.stats(),
+        "principal": principal_cache.stats(),
+        "kelas": kelas_cache.stats(),
+        "siswa_qr": siswa_qr_cache.stats(),
+    }
+
+
+# NOTE: Admission Control
+
+
+@router.get("/admission", dependencies=[Depends(get_active_admin)])
+async def read_admission():
+    """
+    **Queued / shed requests per limiter for this worker**
+    """
+    return {name: control.stats() for name, control in admission_controls.items()}
+
+
+# NOTE: Attendance Buffer
+
+
+@router.get("/absensi-buffer", dependencies=[Depends(get_active_admin)])
+async def read_absensi_buffer():
+    """
+    **Pending / flushed attendance scans for this worker**
+    """
+    return absensi_buffer.stats()
@@ -1,15 +1,35 @@
-from typing import Annotated
-from fastapi import APIRouter, HTTPException, Query
+from typing import Annotated, Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from fastapi.params import Body
 from sqlalchemy import select
 
+from app.core import settings
+from app.core.cache import LRUCache
 from app.core.dependencies import SessionDepends
+from app.db.diagnostics import StatementBudget
+from app.core.responses import (
+    etag_matches,
+    json_dumps,
+    make_etag,
+    not_modified_response,
+)
 from app.models.datum_model import KelasModel
 from app.schemas.datums_schema import CreateKelasSchema, KelasOutSchema
 
 router = APIRouter()
 
 
+# NOTE: order_by -> (etag, encoded body) of the kelas catalogue, other
+# order_by values are rejected with 422 before they reach the cache
+kelas_cache: LRUCache[str, tuple[str, bytes]] = LRUCache(
+    maxsize=2, ttl=settings.KELAS_CACHE_TTL
+)
+
+
+def invalidate_kelas_cache() -> None:
+    kelas_cache.clear()
+
+
 # NOTE: Datum Kelas
 
 
@@ -17,7 +37,7 @@ router = APIRouter()
 async def create_kelas(
     *,
     db: SessionDepends,
-    kelas: CreateKelasSchema = Body(..., examples=[{"kelas": "nama kelas"}])
+    kelas: CreateKelasSchema = Body(..., examples=[{"kelas": "nama kelas"}]),
 ):
     query = await db.execute(select(KelasModel).filter_by(kelas=kelas.kelas))
     result = query.scalar()
@@ -28,36 +48,48 @@ async def create_kelas(
     db.add(data)
     await db.commit()
     await db.refresh(data)
+    invalidate_kelas_cache()
     return {"msg": "Succesfully"}
 
 
 @router.get(
     "/kelas",
     response_model=list[KelasOutSchema],
+    dependencies=[Depends(StatementBudget(1))],
 )
 async def read_all_kelas(
     *,
     db: SessionDepends,
     order_by: Annotated[
-        str,
-        Query(
-            description="order by kelas [asc|des] = default is **asc**",
-            enum=["asc", "desc"],
-        ),
-    ] = "asc"
+        Literal["asc", "desc"],
+        Query(description="order by kelas [asc|desc] = default is **asc**"),
+    ] = "asc",
+    if_none_match: Annotated[Optional[str], Header()] = None,
 ):
-    if order_by == "asc":
-        ordered = KelasModel.kelas.asc()
-    elif order_by == "desc":
-        ordered = KelasModel.kelas.desc()
-    else:
-        ordered = None
+    cached = kelas_cache.get(order_by)
+    if cached is None:
+        if order_by == "desc":
+            ordered = KelasModel.kelas.desc()
+        else:
+            ordered = KelasModel.kelas.asc()
+
+        query = await db.execute(select(KelasModel).order_by(ordered))
+        results = query.scalars()
+
+        data: list[dict[str, any]] = []
+        for kelas in results:
+            data.append({"id": kelas.id, "kelas": kelas.kelas})
 
-    query = await db.execute(select(KelasModel).order_by(ordered))
-    results = query.scalars()
+        content = json_dumps(data)
+        cached = (make_etag(content), content)
+        kelas_cache.set(order_by, cached)
 
-    data: list[dict[str, any]] = []
-    for kelas in results:
-        data.append({"id": kelas.id, "kelas": kelas.kelas})
+    etag, content = cached
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.KELAS_CACHE_MAX_AGE}",
+    }
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(headers)
 
-    return data
+    return Response(content=content, media_type="application/json", headers=headers)
@@ -0,0 +1,90 @@
+from typing import Annotated, AsyncIterator, Optional
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.dependencies import SessionDepends, get_active_admin
+from app.core.idcards import idcard_archive_name, idcard_jobs, idcard_path
+from app.core.zipstream import stream_zip
+from app.db.diagnostics import StatementBudget
+from app.models.datum_model import KelasModel
+
+router = APIRouter()
+
+
+async def read_kelas_or_404(db: AsyncSession, kelas_id: int) -> str:
+    query = await db.execute(select(KelasModel.kelas).filter_by(id=kelas_id))
+    kelas = query.scalar()
+    if kelas is None:
+        raise HTTPException(status_code=404, detail="Kelas not found")
+    return kelas
+
+
+# NOTE: ID Card Jobs
+
+
+@router.post("/", status_code=202, dependencies=[Depends(get_active_admin)])
+async def generate_idcards(
+    *,
+    db: SessionDepends,
+    kelas_id: Annotated[
+        Optional[int],
+        Query(description="only the siswa of this kelas, default is **all siswa**"),
+    ] = None,
+):
+    """
+    **Render the ID cards of a kelas or the whole school in the background**
+
+    Poll `/id-cards/jobs/{job_id}` for the progress. Cards whose name, kelas,
+    photo and QR code are unchanged are not rendered again.
+    """
+    if kelas_id is not None:
+        await read_kelas_or_404(db, kelas_id)
+    return idcard_jobs.submit(kelas_id=kelas_id).as_dict()
+
+
+@router.get("/jobs/{job_id}", dependencies=[Depends(get_active_admin)])
+async def read_idcard_job(job_id: str):
+    """
+    **Status of an ID card job**, jobs are only known to the worker that
+    started them
+    """
+    job = idcard_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.as_dict()
+
+
+# NOTE: one SELECT + UPDATE per page of siswa while the zip streams
+@router.get(
+    "/kelas/{kelas_id}",
+    dependencies=[
+        Depends(get_active_admin),
+        Depends(StatementBudget(None, repeats=None)),
+    ],
+)
+async def download_kelas_idcards(*, db: SessionDepends, kelas_id: int):
+    """
+    **Download the ID cards of a kelas as a ZIP of 300 dpi png**
+
+    Missing or outdated cards are rendered first, the archive is streamed
+    while it is written.
+    """
+    kelas = await read_kelas_or_404(db, kelas_id)
+
+    async def entries() -> AsyncIterator[tuple[str, str]]:
+        async for rows in idcard_jobs.pages(kelas_id=kelas_id):
+            results = await idcard_jobs.render(rows)
+            for row, (names, _) in zip(rows, results):
+                name = names["idcard_name"]
+                yield idcard_archive_name(row, name), idcard_path(name)
+
+    filename = f"kartu-pelajar-{kelas}.zip"
+    return StreamingResponse(
+        stream_zip(entries()),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"
+        },
+    )
@@ -1,23 +1,43 @@
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response
+from typing import Annotated, Optional
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Response
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import select
-from app.core.dependencies import CurrentUser, SessionDepends, get_jwt_identity
+from jose import JWTError, jwt
+from sqlalchemy import func, select
+from app.core.dependencies import (
+    CurrentUser,
+    SessionDepends,
+    invalidate_principal,
+)
 from app.core.security import (
+    ALGORITHM,
+    REFRESH_TOKEN_TYPE,
     create_access_token,
     create_refresh_token,
-    password_hash_check,
+    new_session_id,
+    password_hasher,
+)
+from app.db.diagnostics import StatementBudget
+from app.db.crud.user_crud import (
+    record_login,
+    revoke_refresh_token,
+    rotate_refresh_token,
+    user_detail_options,
 )
-from app.models.user_model import UserLoginModel, UserModel
+from app.models.user_model import UserModel
 from app.schemas import token_schema
 from app.core import settings
+from app.core.responses import is_not_modified, not_modified_response
 from app.schemas.user_schema import UserOutSchm
-
+from app.schemas.user_serializer import user_validators
 
 router = APIRouter()
 
 
-@router.post("/login", response_model=token_schema.TokenShema)
+@router.post(
+    "/login",
+    response_model=token_schema.TokenShema,
+    dependencies=[Depends(StatementBudget(4))],
+)
 async def login(
     *, db: SessionDepends, form_data: OAuth2PasswordRequestForm = Depends()
 ):
@@ -29,35 +49,23 @@ async def login(
     if not user:
         raise HTTPException(status_code=401, detail="Username invalid")
 
-    if not password_hash_check(form_data.password, user.hashed_password):
+    if not await password_hasher.verify(form_data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Password invalid")
     identity = {
         "username": user.username,
         # "user_id": f"{user.uuid}",
         # "scopes": form_data.scopes if form_data.scopes else [user.role],
     }
+    # NOTE: every login is its own session, other devices keep theirs
+    session_id = new_session_id()
     access_token = create_access_token(identity=identity)
-    refresh_token = create_refresh_token(identity=identity)
-
-    # NOTE: CHECK USER LOGIN
-    query_user_login = await db.execute(
-        select(UserLoginModel).filter_by(user_id=user.id)
-    )
-    user_login = query_user_login.scalar()
-    if user_login:
-        user_login.refreh_token = refresh_token
-        user_login.counter_login += 1
-        user_login.expire_token = datetime.now() + timedelta(
-            minutes=settings.REFRESH_EXPIRE_TIMEDETLA_MINUTE
-        )
-        await db.commit()
+    refresh_token = create_refresh_token(identity=identity, session_id=session_id)
 
     # NOTE: SET USER LOGIN
-    if not user_login:
-        user_login = UserLoginModel(refrehToken=refresh_token, userID=user.id)
-        db.add(user_login)
-        await db.commit()
-    await db.refresh(user_login)
+    await record_login(
+        db, user_id=user.id, session_id=session_id, refresh_token=refresh_token
+    )
+    await db.commit()
 
     return {
         "access_token": access_token,
@@ -66,17 +74,79 @@ async def login(
     }
 
 
-@router.get("/me", response_model_exclude_unset=True, response_model_exclude_none=True)
-def get_current_user(*, db: SessionDepends, current_user: CurrentUser) -> UserOutSchm:
+@router.get(
+    "/me",
+    response_model_exclude_unset=True,
+    response_model_exclude_none=True,
+    dependencies=[Depends(StatementBudget(1))],
+)
+def get_current_user(
+    *,
+    response: Response,
+    current_user: CurrentUser,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    if_modified_since: Annotated[Optional[str], Header()] = None,
+) -> UserOutSchm:
     """
     **Get Current User**
     """
+    # NOTE: validators come from the cached principal, no extra query
+    headers = user_validators(
+        current_user.uuid, current_user.version, current_user.updated_at
+    )
+    if is_not_modified(
+        if_none_match=if_none_match,
+        if_modified_since=if_modified_since,
+        etag=headers["ETag"],
+        last_modified=current_user.updated_at,
+    ):
+        return not_modified_response(headers)
+
+    response.headers.update(headers)
     return current_user
 
 
-@router.get("/refresh-token")
-async def refresh_token():
-    ...
+@router.post(
+    "/refresh-token",
+    response_model=token_schema.TokenShema,
+    dependencies=[Depends(StatementBudget(3))],
+)
+async def refresh_token(*, db: SessionDepends, data: token_schema.RefreshTokenSchema):
+    """
+    **Refresh Token**
+
+    Exchange a refresh token for a new access / refresh token pair. The old
+    refresh token is spent; presenting it again revokes the session.
+    """
+    try:
+        payload = jwt.decode(
+            data.refresh_token, settings.SECRET_KEY, algorithms=[ALGORITHM]
+        )
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Refresh token invalid")
+
+    session_id = payload.get("sid")
+    if payload.get("type") != REFRESH_TOKEN_TYPE or not isinstance(session_id, str):
+        raise HTTPException(status_code=401, detail="Refresh token invalid")
+
+    rotated = await rotate_refresh_token(
+        db, session_id=session_id, refresh_token=data.refresh_token
+    )
+
+    # NOTE: a signed, unexpired token that is not the newest of its session was
+    # already rotated, treat it as stolen and end that session only
+    if not rotated:
+        await revoke_refresh_token(db, session_id=session_id)
+        await db.commit()
+        raise HTTPException(status_code=401, detail="Refresh token reuse detected")
+    await db.commit()
+
+    username, new_refresh_token = rotated
+    return {
+        "access_token": create_access_token(identity={"username": username}),
+        "refresh_token": new_refresh_token,
+        "token_type": "bearer",
+    }
 
 
 @router.put("/me/update-profile")
@@ -129,7 +199,11 @@ async def update_profile_user_login(
         },
     ),
 ):
-    query = await db.execute(select(UserModel).filter_by(username=curret_user.username))
+    query = await db.execute(
+        select(UserModel)
+        .options(*user_detail_options(curret_user.role))
+        .filter_by(username=curret_user.username)
+    )
     user = query.scalar()
 
     if curret_user.role == "admin":
@@ -185,7 +259,9 @@ async def update_profile_user_login(
         )
         user.siswa.telp = data.get("telp") if data.get("telp") else user.siswa.telp
 
+    user.updated_at = func.now()
     await db.commit()
     await db.refresh(user)
+    invalidate_principal(curret_user.username, user.username)
 
     return {"msg": "upate profile success."}
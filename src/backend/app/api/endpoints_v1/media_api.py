@@ -0,0 +1,128 @@
+import os
+import re
+from typing import Annotated, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import FileResponse
+from sqlalchemy import select
+from app.core import settings
+from app.core.dependencies import (
+    SessionDepends,
+    get_active_admin,
+    get_current_active_user,
+    invalidate_principal,
+)
+from app.core.media import media_pool
+from app.core.photos import PHOTO_VARIANTS, photo_variant_name, process_photo
+from app.core.responses import etag_matches, not_modified_response
+from app.core.uploads import receive_upload
+from app.db.crud.siswa_media_crud import update_siswa_media
+from app.db.diagnostics import StatementBudget
+from app.models.user_model import UserDetailSiswa, UserModel
+
+router = APIRouter()
+
+# content addressed files under MEDIA_ROOT/<kind>, nothing else is served
+MEDIA_KINDS = ("photos", "qr", "idcards")
+MEDIA_NAME = re.compile(r"^[0-9a-f]{32}(_\d+)?\.(png|jpg)$")
+# NOTE: a name never changes its content, but the files are personal data and
+# must stay out of shared caches
+MEDIA_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+# NOTE: Siswa Photo
+
+
+@router.put(
+    "/siswa/{user_id}/photo",
+    dependencies=[Depends(get_active_admin), Depends(StatementBudget(4))],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"],
+                    }
+                }
+            },
+        }
+    },
+)
+async def upload_siswa_photo(*, db: SessionDepends, request: Request, user_id: UUID):
+    """
+    **Upload the photo of a siswa (multipart field `file`)**
+
+    The upload is streamed to disk, the photo and its thumbnails are made
+    off the event loop. Same photo again -> same `photo_name`.
+    """
+    query = await db.execute(
+        select(UserModel.id, UserModel.username)
+        .join(UserDetailSiswa, UserDetailSiswa.user_id == UserModel.id)
+        .filter(UserModel.uuid == user_id)
+    )
+    siswa = query.first()
+    # NOTE: give the connection back, the upload may take a while
+    await db.rollback()
+    if siswa is None:
+        raise HTTPException(status_code=404, detail="Siswa not found")
+
+    upload = await receive_upload(
+        request, field="file", max_bytes=settings.PHOTO_MAX_BYTES
+    )
+    try:
+        photo_name = await media_pool.run(process_photo, upload.path, upload.sha256)
+    except ValueError as error:
+        raise HTTPException(status_code=415, detail=str(error))
+    finally:
+        upload.discard()
+
+    await update_siswa_media(db, {siswa.id: {"photo_name": photo_name}})
+    await db.commit()
+    invalidate_principal(siswa.username)
+
+    return {
+        "photo_name": photo_name,
+        "thumbnails": {
+            str(size): photo_variant_name(photo_name, size) for size in PHOTO_VARIANTS
+        },
+    }
+
+
+# NOTE: Media Files
+
+
+@router.get("/{kind}/{name}", dependencies=[Depends(get_current_active_user)])
+async def read_media(
+    kind: str,
+    name: str,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+):
+    """
+    **Serve a photo, thumbnail, QR code or ID card**
+
+    Needs a logged in user, fetch it with the `Authorization` header (not a
+    bare `<img src>`). Supports `Range` / `If-Range`, `If-None-Match` and is
+    cached for a year by the browser only.
+    """
+    if kind not in MEDIA_KINDS or not MEDIA_NAME.match(name):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    path = os.path.join(settings.MEDIA_ROOT, kind, name)
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    headers = {
+        "ETag": f'"{os.path.splitext(name)[0]}"',
+        "Cache-Control": MEDIA_CACHE_CONTROL,
+    }
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified_response(headers)
+
+    # NOTE: FileResponse handles byte ranges and hands the file to the server
+    # with `http.response.pathsend` (sendfile) where it is supported
+    return FileResponse(path, headers=headers, stat_result=stat_result)
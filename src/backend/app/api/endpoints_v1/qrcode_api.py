@@ -0,0 +1,46 @@
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from app.core.dependencies import SessionDepends, get_active_admin
+from app.core.qrcodes import qr_jobs
+from app.models.datum_model import KelasModel
+
+router = APIRouter()
+
+
+# NOTE: QR Code Jobs
+
+
+@router.post("/", status_code=202, dependencies=[Depends(get_active_admin)])
+async def generate_qr_codes(
+    *,
+    db: SessionDepends,
+    kelas_id: Annotated[
+        Optional[int],
+        Query(description="only the siswa of this kelas, default is **all siswa**"),
+    ] = None,
+):
+    """
+    **Generate the QR codes of a kelas or the whole school in the background**
+
+    Poll `/qr-codes/jobs/{job_id}` for the progress. Unchanged QR codes are
+    not rendered again.
+    """
+    if kelas_id is not None:
+        query = await db.execute(select(KelasModel.id).filter_by(id=kelas_id))
+        if query.scalar() is None:
+            raise HTTPException(status_code=404, detail="Kelas not found")
+
+    return qr_jobs.submit(kelas_id=kelas_id).as_dict()
+
+
+@router.get("/jobs/{job_id}", dependencies=[Depends(get_active_admin)])
+async def read_qr_job(job_id: str):
+    """
+    **Status of a QR code job**, jobs are only known to the worker that
+    started them
+    """
+    job = qr_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.as_dict()
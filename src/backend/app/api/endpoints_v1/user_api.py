@@ -1,12 +1,28 @@
+import csv
+import io
+import json
 from datetime import date
 from enum import Enum
-from typing import Annotated, List
+from typing import Annotated, Any, AsyncGenerator, List, Optional
 from uuid import UUID
-from sqlalchemy import select
-from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    UploadFile,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from app.core.dependencies import (
     SessionDepends,
     get_active_admin,
+    invalidate_principal,
 )
 from app.models.user_model import (
     AgamaEnum,
@@ -22,8 +38,20 @@ from app.schemas.user_schema import (
     UpdateUserSchema,
     UserOutSchm,
 )
-from app.core.security import gen_password_hash
-
+from app.schemas.user_serializer import user_out, user_validators
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.responses import (
+    is_not_modified,
+    json_response,
+    not_modified_response,
+)
+from app.core.tabular import read_tabular_rows
+from app.core.qrcodes import qr_jobs
+from app.core.security import password_hasher
+from app.db.crud.user_crud import user_detail_options, user_list_filters
+from app.db.crud.user_import import IMPORT_MAX_ROWS, bulk_create_users, nest_flat_row
+from app.db.diagnostics import StatementBudget
+from app.db.engine import SessionLocal
 
 router = APIRouter()
 
@@ -33,9 +61,33 @@ class OrdeyBy(str, Enum):
     desc = "desc"
 
 
-@router.post(
-    "/create-user", status_code=201, dependencies=[Depends(get_active_admin())]
-)
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_COLUMNS: list[str] = [
+    "user_id",
+    "username",
+    "full_name",
+    "role",
+    "is_active",
+    "created_at",
+    "updated_at",
+    "gender",
+    "agama",
+    "alamat",
+    "telp",
+    "tempat_lahir",
+    "tgl_lahir",
+    "nama_ortu",
+    "kelas_id",
+    "kelas",
+]
+
+
+@router.post("/create-user", status_code=201, dependencies=[Depends(get_active_admin)])
 async def create_user(
     *,
     db: SessionDepends,
@@ -111,7 +163,7 @@ async def create_user(
         user_data = user_create.model_dump(
             exclude_unset=True, exclude={"admin", "password"}
         )
-        hash_pswd = gen_password_hash(user_create.password)
+        hash_pswd = await password_hasher.hash(user_create.password)
         detail_user = user_create.admin.model_dump(
             exclude_unset=True, exclude_none=True
         )
@@ -124,7 +176,7 @@ async def create_user(
         user_data = user_create.model_dump(
             exclude_unset=True, exclude={"guru", "password"}
         )
-        hash_pswd = gen_password_hash(user_create.password)
+        hash_pswd = await password_hasher.hash(user_create.password)
         detail_user = user_create.guru.model_dump(
             exclude_unset=True, exclude_none=True, exclude_defaults=True
         )
@@ -138,7 +190,7 @@ async def create_user(
         user_data = user_create.model_dump(
             exclude_unset=True, exclude={"siswa", "password"}
         )
-        hash_pswd = gen_password_hash(user_create.password)
+        hash_pswd = await password_hasher.hash(user_create.password)
         detail_user = user_create.siswa.model_dump(
             exclude_unset=True, exclude_none=True, exclude_defaults=True
         )
@@ -152,14 +204,97 @@ async def create_user(
     db.add(user_in)
     await db.commit()
     await db.refresh(user_in)
+    if user_create.role == EnumRole.siswa:
+        qr_jobs.submit(user_ids=[user_in.id])
 
     # return user_in
 
 
+async def submit_imported_qr(db: AsyncSession, report: dict[str, Any]) -> None:
+    usernames = [
+        item["username"] for item in report["results"] if item["status"] == "created"
+    ]
+    if not usernames:
+        return
+    query = await db.execute(
+        select(UserDetailSiswa.user_id)
+        .join(UserModel, UserModel.id == UserDetailSiswa.user_id)
+        .filter(UserModel.username.in_(usernames))
+    )
+    user_ids = list(query.scalars())
+    if user_ids:
+        qr_jobs.submit(user_ids=user_ids)
+
+
+# NOTE: chunked executemany repeats the same INSERTs by design
+@router.post(
+    "/import",
+    dependencies=[
+        Depends(get_active_admin),
+        Depends(StatementBudget(None, repeats=None)),
+    ],
+)
+async def import_users(
+    *,
+    db: SessionDepends,
+    users: list[dict[str, Any]] = Body(
+        ...,
+        examples=[
+            [
+                {
+                    "username": "nisn",
+                    "password": "password",
+                    "full_name": "full name",
+                    "role": EnumRole.siswa,
+                    "is_active": True,
+                    "siswa": {"gender": GenderEnum.laki, "kelas_id": None},
+                }
+            ]
+        ],
+    ),
+):
+    """
+    **Bulk create users from a JSON array of create-user bodies**
+    """
+    if len(users) > IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=413, detail=f"Max {IMPORT_MAX_ROWS} users per import."
+        )
+    report = await bulk_create_users(db, users)
+    await submit_imported_qr(db, report)
+    return report
+
+
+@router.post(
+    "/import-file",
+    dependencies=[
+        Depends(get_active_admin),
+        Depends(StatementBudget(None, repeats=None)),
+    ],
+)
+async def import_users_file(*, db: SessionDepends, file: UploadFile = File(...)):
+    """
+    **Bulk create users from a .csv / .xlsx file**
+
+    Columns: `username, password, full_name, role, is_active` plus the detail
+    columns of the role (`gender, agama, alamat, telp, tempat_lahir, tgl_lahir,
+    nama_ortu, kelas_id`).
+    """
+    # NOTE: parsing a large workbook is CPU bound, keep it off the event loop
+    rows = await run_in_threadpool(read_tabular_rows, file.filename, await file.read())
+    if len(rows) > IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=413, detail=f"Max {IMPORT_MAX_ROWS} users per import."
+        )
+    report = await bulk_create_users(db, [nest_flat_row(row) for row in rows])
+    await submit_imported_qr(db, report)
+    return report
+
+
 @router.get(
     "/",
     summary="All Users",
-    dependencies=[Depends(get_active_admin)],
+    dependencies=[Depends(get_active_admin), Depends(StatementBudget(2))],
     response_model=List[UserOutSchm],
     response_model_exclude_defaults=False,
     response_model_exclude_unset=True,
@@ -178,6 +313,17 @@ async def read_users(
             description="order by id [asc|desc] = default is **asc**",
         ),
     ] = "asc",
+    cursor: Annotated[
+        Optional[str],
+        Query(
+            description="cursor from the **X-Next-Cursor** header of the previous "
+            "page, replaces **skip**",
+        ),
+    ] = None,
+    role: Optional[EnumRole] = None,
+    kelas_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    gender: Optional[GenderEnum] = None,
 ):
     if order_by == OrdeyBy.asc:
         ordered_by = UserModel.id.asc()
@@ -186,156 +332,179 @@ async def read_users(
     else:
         ordered_by = None
 
-    db_stmt = await db.execute(
-        select(UserModel).offset(skip).limit(limit).order_by(ordered_by)
-    )
-    db_result = db_stmt.scalars()
-    data: list[UserModel] = []
-    for user in db_result:
-        if user.role == EnumRole.admin:
-            data.append(
-                {
-                    "uuid": user.uuid,
-                    "username": user.username,
-                    "full_name": user.full_name.title(),
-                    "role": user.role,
-                    "is_active": user.is_active,
-                    "created_at": user.created_at,
-                    "updated_at": user.updated_at,
-                    "admin": {
-                        "gender": user.admin.gender,
-                        "agama": user.admin.agama,
-                        "alamat": user.admin.alamat,
-                        "telp": user.admin.telp,
-                    },
-                }
-            )
-        if user.role == EnumRole.guru:
-            data.append(
-                {
-                    "uuid": user.uuid,
-                    "username": user.username,
-                    "full_name": user.full_name.title(),
-                    "role": user.role,
-                    "is_active": user.is_active,
-                    "created_at": user.created_at,
-                    "updated_at": user.updated_at,
-                    "guru": {
-                        "gender": user.guru.gender,
-                        "agama": user.guru.agama,
-                        "alamat": user.guru.alamat,
-                        "telp": user.guru.telp,
-                    },
-                }
+    stmt = (
+        select(UserModel)
+        .options(*user_detail_options(role))
+        .filter(
+            *user_list_filters(
+                role=role, is_active=is_active, kelas_id=kelas_id, gender=gender
             )
-        if user.role == EnumRole.siswa:
-            data.append(
-                {
-                    "uuid": user.uuid,
-                    "username": user.username,
-                    "full_name": user.full_name.title(),
-                    "role": user.role,
-                    "is_active": user.is_active,
-                    "created_at": user.created_at,
-                    "updated_at": user.updated_at,
-                    "siswa": {
-                        "gender": user.siswa.gender,
-                        "tempat_lahir": user.siswa.tempat_lahir,
-                        "tgl_lahir": user.siswa.tgl_lahir,
-                        "agama": user.siswa.agama,
-                        "nama_ortu": user.siswa.nama_ortu,
-                        "alamat": user.siswa.alamat,
-                        "telp": user.siswa.telp,
-                        "kelas_id": user.siswa.kelas_id,
-                        "kelas": user.siswa.kelas.kelas,
-                        "qr_name": user.siswa.qr_name,
-                        "photo_name": user.siswa.photo_name,
-                        "idcard_name": user.siswa.idcard_name,
-                    },
-                }
+        )
+        .limit(limit)
+        .order_by(ordered_by)
+    )
+
+    # NOTE: keyset pagination -> seek past the last id instead of scanning skipped rows
+    if cursor:
+        position = decode_cursor(cursor)
+        after_id = position.get("id")
+        if not isinstance(after_id, int) or position.get("order_by") != order_by:
+            raise HTTPException(status_code=400, detail="Cursor not valid.")
+        if order_by == OrdeyBy.desc:
+            stmt = stmt.filter(UserModel.id < after_id)
+        else:
+            stmt = stmt.filter(UserModel.id > after_id)
+    else:
+        stmt = stmt.offset(skip)
+
+    db_stmt = await db.execute(stmt)
+    users = db_stmt.scalars().all()
+    data = [user_out(user) for user in users]
+    headers: dict[str, str] = {}
+    if users and len(users) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(
+            {"id": users[-1].id, "order_by": order_by}
+        )
+    return json_response(data, headers=headers)
+
+
+def user_export_row(user: UserModel) -> dict[str, Any]:
+    # NOTE: only the relationship of the row's role is loaded, the others raise
+    detail = getattr(user, user.role.value)
+    row: dict[str, Any] = {
+        "user_id": str(user.uuid),
+        "username": user.username,
+        "full_name": user.full_name.title(),
+        "role": user.role.value,
+        "is_active": user.is_active,
+        "created_at": user.created_at.isoformat(),
+        "updated_at": user.updated_at.isoformat(),
+    }
+    for field in EXPORT_COLUMNS[7:]:
+        value = getattr(detail, field, None)
+        if field == "kelas":
+            value = value.kelas if value else None
+        elif isinstance(value, Enum):
+            value = value.value
+        elif isinstance(value, date):
+            value = value.isoformat()
+        row[field] = value
+    return row
+
+
+async def stream_users_export(
+    stmt, export_format: ExportFormat
+) -> AsyncGenerator[str, None]:
+    # NOTE: own session -> it has to outlive the request handler while streaming
+    async with SessionLocal() as db:
+        result = await db.stream_scalars(
+            stmt, execution_options={"yield_per": EXPORT_CHUNK_SIZE}
+        )
+        if export_format == ExportFormat.csv:
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+            writer.writeheader()
+            async for users in result.partitions():
+                writer.writerows(user_export_row(user) for user in users)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        else:
+            async for users in result.partitions():
+                yield "".join(
+                    json.dumps(user_export_row(user)) + "\n" for user in users
+                )
+
+
+@router.get(
+    "/export",
+    summary="Export Users",
+    dependencies=[Depends(get_active_admin)],
+    response_class=StreamingResponse,
+)
+async def export_users(
+    *,
+    export_format: Annotated[
+        ExportFormat, Query(alias="format", description="[ndjson|csv]")
+    ] = ExportFormat.ndjson,
+    role: Optional[EnumRole] = None,
+    kelas_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    gender: Optional[GenderEnum] = None,
+):
+    """
+    **Stream every matching user as NDJSON or CSV, memory stays flat**
+    """
+    stmt = (
+        select(UserModel)
+        .options(*user_detail_options(role))
+        .filter(
+            *user_list_filters(
+                role=role, is_active=is_active, kelas_id=kelas_id, gender=gender
             )
-    return data
+        )
+        .order_by(UserModel.id.asc())
+    )
+    if export_format == ExportFormat.csv:
+        media_type, filename = "text/csv", "users.csv"
+    else:
+        media_type, filename = "application/x-ndjson", "users.ndjson"
+
+    return StreamingResponse(
+        stream_users_export(stmt, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get(
     "/{user_id}",
     response_model=UserOutSchm,
-    dependencies=[Depends(get_active_admin)],
+    dependencies=[Depends(get_active_admin), Depends(StatementBudget(3))],
     response_model_exclude_unset=True,
     response_model_exclude_defaults=False,
 )
-async def read_user(*, db: SessionDepends, user_id: UUID):
-    db_stmt = await db.execute(select(UserModel).filter(UserModel.uuid == user_id))
+async def read_user(
+    *,
+    db: SessionDepends,
+    user_id: UUID,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    if_modified_since: Annotated[Optional[str], Header()] = None,
+):
+    # NOTE: revalidation only needs version & updated_at, skip the joined
+    # detail query
+    if if_none_match or if_modified_since:
+        db_stmt = await db.execute(
+            select(UserModel.version, UserModel.updated_at).filter(
+                UserModel.uuid == user_id
+            )
+        )
+        row = db_stmt.first()
+        if not row:
+            raise HTTPException(status_code=404, detail="User not found.")
+
+        headers = user_validators(user_id, row.version, row.updated_at)
+        if is_not_modified(
+            if_none_match=if_none_match,
+            if_modified_since=if_modified_since,
+            etag=headers["ETag"],
+            last_modified=row.updated_at,
+        ):
+            return not_modified_response(headers)
+
+    db_stmt = await db.execute(
+        select(UserModel)
+        .options(*user_detail_options())
+        .filter(UserModel.uuid == user_id)
+    )
     user = db_stmt.scalar()
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
 
-    data: dict[str, any] = {}
-    if user.role == EnumRole.admin:
-        data.update(
-            {
-                "uuid": user.uuid,
-                "username": user.username,
-                "full_name": user.full_name.title(),
-                "role": user.role,
-                "is_active": user.is_active,
-                "created_at": user.created_at,
-                "updated_at": user.updated_at,
-                "admin": {
-                    "gender": user.admin.gender,
-                    "agama": user.admin.agama,
-                    "alamat": user.admin.alamat,
-                    "telp": user.admin.telp,
-                },
-            }
-        )
-    if user.role == EnumRole.guru:
-        data.update(
-            {
-                "uuid": user.uuid,
-                "username": user.username,
-                "full_name": user.full_name.title(),
-                "role": user.role,
-                "is_active": user.is_active,
-                "created_at": user.created_at,
-                "updated_at": user.updated_at,
-                "guru": {
-                    "gender": user.guru.gender,
-                    "agama": user.guru.agama,
-                    "alamat": user.guru.alamat,
-                    "telp": user.guru.telp,
-                },
-            }
-        )
-
-    if user.role == EnumRole.siswa:
-        data.update(
-            {
-                "uuid": user.uuid,
-                "username": user.username,
-                "full_name": user.full_name.title(),
-                "role": user.role,
-                "is_active": user.is_active,
-                "created_at": user.created_at,
-                "updated_at": user.updated_at,
-                "siswa": {
-                    "gender": user.siswa.gender,
-                    "tempat_lahir": user.siswa.tempat_lahir,
-                    "tgl_lahir": user.siswa.tgl_lahir,
-                    "agama": user.siswa.agama,
-                    "nama_ortu": user.siswa.nama_ortu,
-                    "alamat": user.siswa.alamat,
-                    "telp": user.siswa.telp,
-                    "kelas_id": user.siswa.kelas_id,
-                    "kelas": user.siswa.kelas.kelas if user.siswa.kelas_id else None,
-                    "qr_name": user.siswa.qr_name,
-                    "photo_name": user.siswa.photo_name,
-                    "idcard_name": user.siswa.idcard_name,
-                },
-            }
-        )
-
-    return data
+    return json_response(
+        user_out(user),
+        headers=user_validators(user.uuid, user.version, user.updated_at),
+    )
 
 
 @router.put(
@@ -403,10 +572,13 @@ async def update_user(
         },
     ),
 ):
-    db_stmt = await db.execute(select(UserModel).filter_by(uuid=user_id))
+    db_stmt = await db.execute(
+        select(UserModel).options(*user_detail_options()).filter_by(uuid=user_id)
+    )
     user = db_stmt.scalar()
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
+    old_username = user.username
 
     if user.role == EnumRole.admin:
         user.username = model.username if model.username else user.username
@@ -457,10 +629,25 @@ async def update_user(
             model.siswa.kelas_id if model.siswa.kelas_id else user.siswa.kelas_id
         )
 
+    # NOTE: detail rows carry no timestamp, touching the parent also bumps its
+    # `version` so the ETag changes
+    user.updated_at = func.now()
+    user_pk, new_username = user.id, user.username
     await db.commit()
-    await db.refresh(user)
+    invalidate_principal(old_username, new_username)
+
+    db_stmt = await db.execute(
+        select(UserModel)
+        .options(*user_detail_options())
+        .filter_by(id=user_pk)
+        .execution_options(populate_existing=True)
+    )
+    user = db_stmt.scalar()
 
-    return user
+    return json_response(
+        user_out(user),
+        headers=user_validators(user.uuid, user.version, user.updated_at),
+    )
 
 
 @router.put("/change-password/{username}", dependencies=[Depends(get_active_admin)])
@@ -486,12 +673,13 @@ async def update_password_user(
         )
 
     else:
-        hash_pass = gen_password_hash(password)
+        hash_pass = await password_hasher.hash(password)
 
-    user.password = hash_pass
+    user.hashed_password = hash_pass
 
     await db.commit()
     await db.refresh(user)
+    invalidate_principal(user.username)
 
     return {"msg": "update pass success."}
 
@@ -503,6 +691,8 @@ async def delete_user(*, db: SessionDepends, user_id: UUID):
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
 
+    username = user.username
     await db.delete(user)
     await db.commit()
+    invalidate_principal(username)
     return {"msg": "User has been deleted"}
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from datetime import date, datetime
+from typing import Any, Optional
+from uuid import UUID
+from app.core import settings
+from app.core.cache import LRUCache
+from app.db.crud import absensi_crud
+from app.db.engine import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class AbsensiBuffer:
+    """
+    Write-behind ledger of the attendance scans of this worker.
+
+    Repeat scans are dropped in memory against a per-day set of user ids
+    (reloaded from `tb_absensi` the first time a day is seen), new ones are
+    queued and written by a background task in batched INSERTs every
+    `flush_interval` seconds or as soon as `flush_size` rows are pending.
+    Across workers the unique (user_id, tanggal) index has the last word.
+
+    **Parameters**
+
+    * `flush_size`: pending rows that trigger a flush before the interval
+    * `flush_interval`: max seconds a scan waits in memory
+    * `max_pending`: scans are refused (`is_full`) beyond this many, e.g.
+      while the database is down
+    """
+
+    def __init__(self, *, flush_size: int, flush_interval: float, max_pending: int):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        # tanggal -> user ids present that day, today and maybe yesterday
+        self._days: LRUCache[date, set[int]] = LRUCache(maxsize=2)
+        self._days_lock = asyncio.Lock()
+        self._pending: list[dict[str, Any]] = []
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.accepted: int = 0
+        self.duplicates: int = 0
+        self.flushed: int = 0
+        self.flushes: int = 0
+        self.failed_flushes: int = 0
+        self.max_pending_seen: int = 0
+
+    def start(self) -> None:
+        # NOTE: call from the lifespan, a task started inside a request would
+        # inherit the request context (metrics, statement budgets)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def shutdown(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def _present(self, tanggal: date) -> set[int]:
+        present = self._days.get(tanggal)
+        if present is not None:
+            return present
+
+        async with self._days_lock:
+            present = self._days.get(tanggal)
+            if present is None:
+                async with SessionLocal() as db:
+                    present = await absensi_crud.read_present_user_ids(db, tanggal)
+                # scans of that day still waiting for a flush
+                present.update(
+                    row["user_id"] for row in self._pending if row["tanggal"] == tanggal
+                )
+                self._days.set(tanggal, present)
+        return present
+
+    def is_full(self) -> bool:
+        return len(self._pending) >= self.max_pending
+
+    async def record(self, user_id: int, scanned_at: datetime) -> bool:
+        """
+        Queue the first scan of a siswa on the day of `scanned_at`, returns
+        `False` for a repeat scan.
+        """
+        tanggal = scanned_at.date()
+        present = await self._present(tanggal)
+        if user_id in present:
+            self.duplicates += 1
+            return False
+
+        present.add(user_id)
+        self._pending.append(
+            {"user_id": user_id, "tanggal": tanggal, "jam_masuk": scanned_at}
+        )
+        self.accepted += 1
+        self.max_pending_seen = max(self.max_pending_seen, len(self._pending))
+        if len(self._pending) >= self.flush_size:
+            self._wakeup.set()
+        return True
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+
+            try:
+                async with SessionLocal() as db:
+                    await absensi_crud.insert_absensi(db, rows)
+                    await db.commit()
+            except Exception:
+                # NOTE: keep the scans for the next round, new ones queue behind
+                self._pending[:0] = rows
+                self.failed_flushes += 1
+                logger.exception("flushing %d attendance scans failed", len(rows))
+                return 0
+
+            self.flushes += 1
+            self.flushed += len(rows)
+            return len(rows)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "max_pending_seen": self.max_pending_seen,
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "flushed": self.flushed,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+absensi_buffer = AbsensiBuffer(
+    flush_size=settings.ABSENSI_FLUSH_SIZE,
+    flush_interval=settings.ABSENSI_FLUSH_INTERVAL,
+    max_pending=settings.ABSENSI_MAX_PENDING,
+)
+
+
+# NOTE: qr content (uuid of the siswa) -> user id, repeat scanners skip the DB
+siswa_qr_cache: LRUCache[UUID, int] = LRUCache(
+    maxsize=settings.ABSENSI_QR_CACHE_MAXSIZE, ttl=settings.ABSENSI_QR_CACHE_TTL
+)
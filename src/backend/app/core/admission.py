@@ -0,0 +1,200 @@
+import asyncio
+import math
+import time
+from typing import Any, AsyncGenerator, Awaitable, Callable, Optional, TypeVar
+from fastapi import HTTPException, Request
+from app.core import settings
+from app.core.cache import LRUCache
+
+
+def _route_name(request: Request) -> Optional[str]:
+    route = request.scope.get("route")
+    return getattr(route, "name", None)
+
+
+async def client_address(request: Request) -> str:
+    """
+    Address of the client. Behind the reverse proxies of `TRUSTED_PROXIES`
+    it is the last `X-Forwarded-For` hop that is not one of them, anyone else
+    could put any address in that header.
+    """
+    host = request.client.host if request.client else "unknown"
+    if host not in settings.TRUSTED_PROXIES:
+        return host
+
+    forwarded = request.headers.get("x-forwarded-for", "")
+    for hop in reversed([hop.strip() for hop in forwarded.split(",")]):
+        if hop and hop not in settings.TRUSTED_PROXIES:
+            return hop
+    return host
+
+
+async def login_client(request: Request) -> str:
+    """
+    Client address plus the normalized `username` of the login form. One
+    client guessing one account is throttled, others can still log in to it.
+    """
+    form = await request.form()
+    username = form.get("username")
+    username = username.strip().lower() if isinstance(username, str) else ""
+    return f"{await client_address(request)} {username}"
+
+
+class ConcurrencyLimit:
+    """
+    Router dependency that admits at most `limit` requests at a time. Up to
+    `queue_size` more wait at most `timeout` seconds for a slot, everything
+    beyond that is shed with 503 + Retry-After before any work is done.
+
+    **Parameters**
+
+    * `name`: label in the admission stats
+    * `routes`: route (endpoint) names to guard, `None` guards every route of
+      the router
+    * `exclude`: route names left to other limits
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        limit: int,
+        queue_size: int,
+        timeout: float,
+        routes: Optional[set[str]] = None,
+        exclude: Optional[set[str]] = None,
+    ):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.routes = routes
+        self.exclude = exclude or set()
+        self._semaphore = asyncio.Semaphore(limit)
+        self.in_flight: int = 0
+        self.queued: int = 0
+        self.max_queued: int = 0
+        self.admitted: int = 0
+        self.rejected: int = 0
+        self.timed_out: int = 0
+
+    def _shed(self) -> HTTPException:
+        return HTTPException(
+            status_code=503,
+            detail="Server is busy, please retry.",
+            headers={"Retry-After": str(max(math.ceil(self.timeout), 1))},
+        )
+
+    async def __call__(self, request: Request) -> AsyncGenerator[None, None]:
+        route = _route_name(request)
+        if route in self.exclude or (
+            self.routes is not None and route not in self.routes
+        ):
+            yield
+            return
+
+        if self._semaphore.locked():
+            if self.queued >= self.queue_size:
+                self.rejected += 1
+                raise self._shed()
+
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                raise self._shed()
+            finally:
+                self.queued -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.admitted += 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class RateLimit:
+    """
+    Router dependency with a token bucket per `key(request)`, the client
+    address by default: `burst` requests at once, refilled at `per_minute`.
+    Empty buckets answer 429 + Retry-After.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        per_minute: int,
+        burst: int,
+        maxsize: int = 10_000,
+        routes: Optional[set[str]] = None,
+        key: Callable[[Request], Awaitable[str]] = client_address,
+    ):
+        self.name = name
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.routes = routes
+        self.key = key
+        # key -> (tokens, last refill), idle keys fall out of the LRU
+        self._buckets: LRUCache[str, tuple[float, float]] = LRUCache(maxsize=maxsize)
+        self.allowed: int = 0
+        self.rejected: int = 0
+
+    async def __call__(self, request: Request) -> None:
+        if self.routes is not None and _route_name(request) not in self.routes:
+            return
+
+        key = await self.key(request)
+        now = time.monotonic()
+        tokens, last = self._buckets.get(key) or (float(self.burst), now)
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+
+        if tokens < 1:
+            self._buckets.set(key, (tokens, now))
+            self.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please retry later.",
+                headers={"Retry-After": str(math.ceil((1 - tokens) / self.rate))},
+            )
+
+        self._buckets.set(key, (tokens - 1, now))
+        self.allowed += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "per_minute": round(self.rate * 60),
+            "burst": self.burst,
+            "keys": len(self._buckets),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+ControlType = TypeVar("ControlType", ConcurrencyLimit, RateLimit)
+
+# NOTE: every limiter registers here so the admin API can report them
+admission_controls: dict[str, ConcurrencyLimit | RateLimit] = {}
+
+
+def register(control: ControlType) -> ControlType:
+    admission_controls[control.name] = control
+    return control
@@ -0,0 +1,74 @@
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, Optional, TypeVar
+
+
+KeyType = TypeVar("KeyType", bound=Hashable)
+ValueType = TypeVar("ValueType")
+
+
+class LRUCache(Generic[KeyType, ValueType]):
+    """
+    Bounded in-process LRU cache with per-entry expiry.
+
+    **Parameters**
+
+    * `maxsize`: max number of entries, the least recently used is evicted
+    * `ttl`: default lifetime in seconds, `None` means no expiry
+    """
+
+    def __init__(self, *, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[KeyType, tuple[ValueType, Optional[float]]] = (
+            OrderedDict()
+        )
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def get(self, key: KeyType) -> Optional[ValueType]:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+
+        value, expire_at = item
+        if expire_at is not None and expire_at <= time.time():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self, key: KeyType, value: ValueType, *, expire_at: Optional[float] = None
+    ) -> None:
+        if expire_at is None and self.ttl is not None:
+            expire_at = time.time() + self.ttl
+        self._data[key] = (value, expire_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: KeyType) -> Optional[ValueType]:
+        item = self._data.pop(key, None)
+        return item[0] if item else None
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional, List
-from pydantic import AnyHttpUrl, MySQLDsn, ValidationInfo, field_validator
+from pydantic import AnyHttpUrl, AnyUrl, MySQLDsn, ValidationInfo, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 
@@ -19,6 +19,68 @@ class Settings(BaseSettings):
     # menit * jam * hari = 7 hari
     REFRESH_EXPIRE_TIMEDETLA_MINUTE: int = 60 * 24 * 7
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
+    # verified access tokens kept per worker
+    TOKEN_CACHE_MAXSIZE: int = 10_000
+    # authenticated user snapshots kept per worker
+    PRINCIPAL_CACHE_MAXSIZE: int = 10_000
+    PRINCIPAL_CACHE_TTL: float = 60.0
+    # kelas catalogue, cached in-process & by clients
+    KELAS_CACHE_TTL: float = 300.0
+    KELAS_CACHE_MAX_AGE: int = 60
+    # password hashing process pool (per uvicorn worker)
+    PASSWORD_HASH_WORKERS: int = 4
+    # max hash/verify jobs in flight, the rest wait in the queue
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 4
+    # of those, max jobs for bulk imports, keep it below the max so logins
+    # are never starved by an import; `None` -> all workers but one
+    PASSWORD_HASH_BULK_CONCURRENCY: Optional[int] = None
+    # admission control (per uvicorn worker), beyond limit + queue -> 503
+    LOGIN_CONCURRENCY: int = 8
+    LOGIN_QUEUE_SIZE: int = 64
+    USERS_CONCURRENCY: int = 8
+    USERS_QUEUE_SIZE: int = 32
+    # exports & imports hold their slot until the last byte, apart from the
+    # rest of /users
+    USERS_EXPORT_CONCURRENCY: int = 2
+    USERS_EXPORT_QUEUE_SIZE: int = 4
+    USERS_IMPORT_CONCURRENCY: int = 1
+    USERS_IMPORT_QUEUE_SIZE: int = 2
+    ADMISSION_QUEUE_TIMEOUT: float = 5.0
+    # login attempts per client address & submitted username
+    LOGIN_RATE_PER_MINUTE: int = 10
+    LOGIN_RATE_BURST: int = 5
+    # login attempts per client address, whatever the username
+    LOGIN_IP_RATE_PER_MINUTE: int = 30
+    LOGIN_IP_RATE_BURST: int = 15
+    # reverse proxies whose X-Forwarded-For names the client
+    TRUSTED_PROXIES: List[str] = []
+    # prometheus text on /metrics, scraped per worker
+    METRICS_ENABLED: bool = True
+    # QR attendance: scans per request & write-behind buffer (per uvicorn worker)
+    ABSENSI_SCAN_BATCH_MAX: int = 1000
+    ABSENSI_FLUSH_SIZE: int = 500
+    ABSENSI_FLUSH_INTERVAL: float = 1.0
+    # pending scans beyond this (database down) are refused with 503
+    ABSENSI_MAX_PENDING: int = 50_000
+    # `scanned_at` must lie within today and the last N days, and may be ahead
+    # of the server clock by at most the skew (seconds)
+    ABSENSI_SCAN_MAX_AGE_DAYS: int = 1
+    ABSENSI_SCAN_CLOCK_SKEW: float = 120.0
+    # qr content -> siswa, a deactivated siswa may still scan until it expires
+    ABSENSI_QR_CACHE_MAXSIZE: int = 5_000
+    ABSENSI_QR_CACHE_TTL: float = 300.0
+    # generated & uploaded files, relative to the working directory
+    MEDIA_ROOT: str = "media"
+    # image process pool for QR codes, ID cards & photos (per uvicorn worker),
+    # siswa per rendered batch
+    MEDIA_WORKERS: int = 2
+    MEDIA_BATCH_SIZE: int = 250
+    # finished jobs kept for the status endpoints
+    MEDIA_JOBS_MAXSIZE: int = 100
+    # truetype font of the ID cards, default is the bundled Pillow font
+    IDCARD_FONT: Optional[str] = None
+    # siswa photo uploads, larger ones are cut off with 413
+    PHOTO_MAX_BYTES: int = 8 * 1024 * 1024
 
     @field_validator("BACKEND_CORS_ORIGINS", mode="before")
     @classmethod
@@ -35,7 +97,9 @@ class Settings(BaseSettings):
     DB_PASSWORD: str
     DB_HOST: str
     DB_NAME: str
-    SQLALCHEMY_DATABASE_URI: Optional[MySQLDsn] = None
+    # assembled as MySQL from the DB_* values, any SQLAlchemy URL when given
+    # explicitly (e.g. sqlite+aiosqlite for the benchmark suite)
+    SQLALCHEMY_DATABASE_URI: Optional[AnyUrl] = None
 
     @field_validator("SQLALCHEMY_DATABASE_URI", mode="before")
     @classmethod
@@ -51,13 +115,51 @@ class Settings(BaseSettings):
             path=data.get("DB_NAME"),
         )
 
+    # Connection pool, sized per uvicorn worker
+    WEB_CONCURRENCY: int = 1
+    # total connections this app may hold, shared by all workers
+    DB_MAX_CONNECTIONS: int = 40
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: float = 10.0
+    # recycle below MySQL wait_timeout so idle connections never go stale
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_SIZE: Optional[int] = None
+
+    @field_validator("DB_POOL_SIZE", mode="before")
+    @classmethod
+    def assemble_pool_size(cls, v: Optional[int], info: ValidationInfo):
+        if v is not None:
+            return v
+        data = info.data
+        per_worker = data.get("DB_MAX_CONNECTIONS") // max(
+            data.get("WEB_CONCURRENCY"), 1
+        )
+        return max(per_worker - data.get("DB_MAX_OVERFLOW"), 1)
+
+    # statements slower than this are logged with their route
+    DB_SLOW_QUERY_MS: float = 500.0
+    # N+1 guard: statements per request / executions of one statement text,
+    # logged in production, fails the request with DB_DIAGNOSTICS_STRICT (dev/test)
+    DB_STATEMENT_BUDGET: int = 30
+    DB_REPEATED_STATEMENT_LIMIT: int = 10
+    DB_DIAGNOSTICS_STRICT: bool = False
+
 
 @lru_cache
 def get_settings():
     return Settings()
 
 
-WEEKDAYLIST: list[str] = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu"]
+WEEKDAYLIST: list[str] = [
+    "Senin",
+    "Selasa",
+    "Rabu",
+    "Kamis",
+    "Jumat",
+    "Sabtu",
+    "Minggu",
+]
 MONTHLIST: list[str] = [
     "Januari",
     "Februari",
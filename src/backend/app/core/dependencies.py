@@ -1,15 +1,21 @@
-from typing import Annotated, Any, Dict, Generator, Optional
+import hashlib
+from typing import Annotated, Any, AsyncGenerator, Dict, Optional
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import ValidationError
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from jose import jwt, JWTError
-from app.db.engine import engine, Base
 from app.db.engine import SessionLocal
 from app.core import settings, security
+from app.core.cache import LRUCache
 from app.schemas.token_schema import TokenPayloadSchema
+from app.schemas.user_schema import UserPrincipalSchema
+from app.schemas.admin_schema import AdminOutSchema
+from app.schemas.guru_schema import GuruOutSchema
+from app.schemas.siswa_schema import SiswaOutSchema
 from app.models.user_model import UserModel
+from app.db.crud.user_crud import user_detail_options
 
 
 oauth2_scheme = OAuth2PasswordBearer(
@@ -17,10 +23,8 @@ oauth2_scheme = OAuth2PasswordBearer(
 )
 
 
-async def get_db() -> Generator:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     db = SessionLocal()
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
     try:
         yield db
     finally:
@@ -31,7 +35,18 @@ SessionDepends = Annotated[AsyncSession, Depends(get_db)]
 TokenDepends = Annotated[str, Depends(oauth2_scheme)]
 
 
+# NOTE: sha256(token) -> identity of already verified tokens, expires with the token
+token_cache: LRUCache[bytes, Dict[str, Any]] = LRUCache(
+    maxsize=settings.TOKEN_CACHE_MAXSIZE
+)
+
+
 def get_jwt_identity(token: TokenDepends) -> Optional[Dict[str, Any]]:
+    token_digest = hashlib.sha256(token.encode()).digest()
+    identity = token_cache.get(token_digest)
+    if identity is not None:
+        return identity
+
     try:
         jwt_decode = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
@@ -39,35 +54,112 @@ def get_jwt_identity(token: TokenDepends) -> Optional[Dict[str, Any]]:
     except (JWTError, ValidationError):
         raise HTTPException(status_code=403, detail="Could not validate credential.")
 
-    return jwt_decode.get("identity")
+    # NOTE: refresh tokens are only accepted by /auth/refresh-token
+    if jwt_decode.get("type") == security.REFRESH_TOKEN_TYPE:
+        raise HTTPException(status_code=403, detail="Could not validate credential.")
+
+    identity = jwt_decode.get("identity")
+    if identity is not None and jwt_decode.get("exp"):
+        token_cache.set(token_digest, identity, expire_at=jwt_decode["exp"])
+    return identity
 
 
-async def get_current_user(db: SessionDepends, token: TokenDepends):
+# NOTE: username -> UserPrincipalSchema, dropped by every route that writes a user
+principal_cache: LRUCache[str, UserPrincipalSchema] = LRUCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE, ttl=settings.PRINCIPAL_CACHE_TTL
+)
+
+
+def build_principal(user: UserModel) -> UserPrincipalSchema:
+    data: dict[str, Any] = {
+        "id": user.id,
+        "uuid": str(user.uuid),
+        "username": user.username,
+        "full_name": user.full_name,
+        "role": user.role,
+        "is_active": user.is_active,
+        "created_at": user.created_at,
+        "updated_at": user.updated_at,
+        "version": user.version,
+    }
+    if user.role == "admin" and user.admin:
+        data["admin"] = AdminOutSchema(
+            gender=user.admin.gender,
+            agama=user.admin.agama,
+            alamat=user.admin.alamat,
+            telp=user.admin.telp,
+        )
+    if user.role == "guru" and user.guru:
+        data["guru"] = GuruOutSchema(
+            gender=user.guru.gender,
+            agama=user.guru.agama,
+            alamat=user.guru.alamat,
+            telp=user.guru.telp,
+        )
+    if user.role == "siswa" and user.siswa:
+        data["siswa"] = SiswaOutSchema(
+            gender=user.siswa.gender,
+            tempat_lahir=user.siswa.tempat_lahir,
+            tgl_lahir=user.siswa.tgl_lahir,
+            agama=user.siswa.agama,
+            nama_ortu=user.siswa.nama_ortu,
+            alamat=user.siswa.alamat,
+            telp=user.siswa.telp,
+            qr_name=user.siswa.qr_name,
+            photo_name=user.siswa.photo_name,
+            idcard_name=user.siswa.idcard_name,
+            kelas_id=user.siswa.kelas_id,
+            kelas=user.siswa.kelas.kelas if user.siswa.kelas else None,
+        )
+    return UserPrincipalSchema(**data)
+
+
+def invalidate_principal(*usernames: Optional[str]) -> None:
+    for username in usernames:
+        if username:
+            principal_cache.pop(username)
+
+
+async def get_current_user(
+    db: SessionDepends, token: TokenDepends
+) -> UserPrincipalSchema:
     try:
         payload = get_jwt_identity(token)
         token_data = TokenPayloadSchema(**payload)
 
-    except (JWTError, token_data.username):
+    except (JWTError, ValidationError, TypeError):
         raise HTTPException(
             status_code=403,
             detail="Could not validate credentials",
         )
-    query = await db.execute(select(UserModel).filter_by(username=token_data.username))
+
+    principal = principal_cache.get(token_data.username)
+    if principal is not None:
+        return principal
+
+    query = await db.execute(
+        select(UserModel)
+        .options(*user_detail_options())
+        .filter_by(username=token_data.username)
+    )
     user = query.scalar()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+
+    principal = build_principal(user)
+    principal_cache.set(principal.username, principal)
+    return principal
 
 
 async def get_current_active_user(
-    get_current_user: Annotated[UserModel, Depends(get_current_user)]
-) -> UserModel:
+    get_current_user: Annotated[UserPrincipalSchema, Depends(get_current_user)]
+) -> UserPrincipalSchema:
     if not get_current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user.")
     return get_current_user
 
 
-CurrentUser = Annotated[UserModel, Depends(get_current_active_user)]
+CurrentUser = Annotated[UserPrincipalSchema, Depends(get_current_active_user)]
 
 
 async def get_active_admin(curret_user: CurrentUser):
@@ -86,3 +178,10 @@ async def get_active_siswa(curret_user: CurrentUser):
     if not curret_user.role == "siswa":
         raise HTTPException(status_code=400, detail="User doesn't have privilages")
     return curret_user
+
+
+# NOTE: gate scanners sign in with a guru or admin account
+async def get_active_scanner(curret_user: CurrentUser):
+    if curret_user.role not in ("admin", "guru"):
+        raise HTTPException(status_code=400, detail="User doesn't have privilages")
+    return curret_user
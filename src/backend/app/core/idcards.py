@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+from typing import Any
+from sqlalchemy import Row
+from app.core import settings
+from app.core.media import MediaResult, SiswaMediaJobs, media_directory, save_atomic
+from app.core.qrcodes import qr_filename, render_qr_code
+
+# NOTE: part of the cache key, bump `version` when the layout changes
+IDCARD_RENDER: dict[str, Any] = {
+    "version": 1,
+    # CR80 card at 300 dpi
+    "size": (1012, 638),
+    "dpi": 300,
+    "header": "#1e3a8a",
+}
+
+
+def idcard_filename(card: dict[str, Any]) -> str:
+    """
+    Cache key of a card: every input that shows on it, the versions of the
+    photo & QR files and the layout. Unchanged inputs -> same file.
+    """
+    photo_version = None
+    if card["photo_path"] and os.path.exists(card["photo_path"]):
+        stat = os.stat(card["photo_path"])
+        photo_version = [stat.st_size, stat.st_mtime_ns]
+    key = json.dumps(
+        [
+            IDCARD_RENDER,
+            settings.PROJECT_NAME,
+            settings.IDCARD_FONT,
+            card["full_name"],
+            card["username"],
+            card["kelas"],
+            qr_filename(card["qr"]),
+            card["photo_name"],
+            photo_version,
+        ],
+        sort_keys=True,
+    )
+    return f"{hashlib.sha256(key.encode()).hexdigest()[:32]}.png"
+
+
+def _font(size: int) -> Any:
+    from PIL import ImageFont
+
+    if settings.IDCARD_FONT:
+        return ImageFont.truetype(settings.IDCARD_FONT, size)
+    return ImageFont.load_default(size)
+
+
+def _fit(draw: Any, text: str, size: int, width: int) -> Any:
+    # NOTE: long names shrink instead of running into the QR code
+    font = _font(size)
+    while size > 16 and draw.textlength(text, font=font) > width:
+        size -= 2
+        font = _font(size)
+    return font
+
+
+def _compose(card: dict[str, Any], qr_path: str) -> Any:
+    from PIL import Image, ImageDraw, ImageOps
+
+    width, height = IDCARD_RENDER["size"]
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+
+    draw.rectangle((0, 0, width, 110), fill=IDCARD_RENDER["header"])
+    draw.text((40, 22), settings.PROJECT_NAME, font=_font(40), fill="white")
+    draw.text((40, 70), "KARTU PELAJAR", font=_font(26), fill="white")
+
+    photo_box = (40, 150, 280, 450)
+    box_size = (photo_box[2] - photo_box[0], photo_box[3] - photo_box[1])
+    if card["photo_path"] and os.path.exists(card["photo_path"]):
+        with Image.open(card["photo_path"]) as photo:
+            photo = ImageOps.fit(
+                ImageOps.exif_transpose(photo).convert("RGB"), box_size
+            )
+            image.paste(photo, photo_box[:2])
+    else:
+        draw.rectangle(photo_box, fill="#e5e7eb")
+        initials = "".join(part[0] for part in card["full_name"].split()[:2]).upper()
+        draw.text(
+            (photo_box[0] + box_size[0] // 2, photo_box[1] + box_size[1] // 2),
+            initials,
+            font=_font(80),
+            fill="#6b7280",
+            anchor="mm",
+        )
+
+    label = _font(24)
+    y = 160
+    for title, text in (
+        ("Nama", card["full_name"]),
+        ("NISN", card["username"]),
+        ("Kelas", card["kelas"] or "-"),
+    ):
+        draw.text((310, y), title, font=label, fill="#6b7280")
+        draw.text((310, y + 30), text, font=_fit(draw, text, 32, 370), fill="black")
+        y += 95
+
+    with Image.open(qr_path) as qr:
+        qr = qr.convert("RGB").resize((280, 280), Image.NEAREST)
+        image.paste(qr, (width - 320, 170))
+    return image
+
+
+def render_idcards(cards: list[dict[str, Any]]) -> list[MediaResult]:
+    """
+    Write the missing cards (and their QR codes) as 300 dpi png, runs in
+    the media pool.
+    """
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        raise RuntimeError("ID card rendering needs `pillow` installed.")
+
+    directory = media_directory("idcards")
+    results: list[MediaResult] = []
+    for card in cards:
+        qr_name, _ = render_qr_code(card["qr"])
+        name = idcard_filename(card)
+        path = os.path.join(directory, name)
+        rendered = not os.path.exists(path)
+        if rendered:
+            image = _compose(card, os.path.join(media_directory("qr"), qr_name))
+            save_atomic(image, path, format="PNG", dpi=(IDCARD_RENDER["dpi"],) * 2)
+        results.append(({"qr_name": qr_name, "idcard_name": name}, rendered))
+    return results
+
+
+def idcard_payload(row: Row) -> dict[str, Any]:
+    return {
+        "qr": str(row.uuid),
+        "username": row.username,
+        "full_name": row.full_name,
+        "kelas": row.kelas,
+        "photo_name": row.photo_name,
+        "photo_path": (
+            os.path.join(settings.MEDIA_ROOT, "photos", row.photo_name)
+            if row.photo_name
+            else None
+        ),
+    }
+
+
+def idcard_path(name: str) -> str:
+    return os.path.join(settings.MEDIA_ROOT, "idcards", name)
+
+
+def idcard_archive_name(row: Row, name: str) -> str:
+    # NOTE: readable & unique inside the zip, `<nisn> <nama>.<ext>`
+    full_name = "".join(c for c in row.full_name if c.isalnum() or c in " .-'")
+    return f"{row.username} {full_name.strip()}{os.path.splitext(name)[1]}"
+
+
+idcard_jobs = SiswaMediaJobs(
+    "idcard",
+    worker=render_idcards,
+    payload=idcard_payload,
+    batch_size=settings.MEDIA_BATCH_SIZE,
+    jobs_maxsize=settings.MEDIA_JOBS_MAXSIZE,
+)
@@ -0,0 +1,241 @@
+import asyncio
+import contextvars
+import logging
+import os
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Optional
+from uuid import uuid4
+from sqlalchemy import Row
+from app.core import settings
+from app.core.cache import LRUCache
+from app.core.dependencies import invalidate_principal
+from app.core.process_pool import ProcessPool
+from app.db.crud import siswa_media_crud
+from app.db.engine import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# worker result per siswa: ({media column: file name}, rendered)
+MediaResult = tuple[dict[str, str], bool]
+
+
+def media_directory(kind: str) -> str:
+    """
+    `MEDIA_ROOT/<kind>`, created on first use (also inside the pool workers).
+    """
+    directory = os.path.join(settings.MEDIA_ROOT, kind)
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def save_atomic(image: Any, path: str, **params: Any) -> None:
+    # NOTE: write aside and rename, readers never see half a file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    image.save(tmp_path, **params)
+    os.replace(tmp_path, path)
+
+
+class MediaPool(ProcessPool):
+    """
+    Process pool for image work (QR codes, ID cards, thumbnails). At most
+    `workers` jobs run, the rest wait.
+    """
+
+    def __init__(self, *, workers: int):
+        super().__init__(workers=workers, max_concurrency=workers)
+
+    async def warm_up(self) -> None:
+        # NOTE: also imports the job modules in the workers, the first upload
+        # or render doesn't pay for it
+        await super().warm_up(media_directory, "tmp")
+
+
+media_pool = MediaPool(workers=settings.MEDIA_WORKERS)
+
+
+class MediaJob:
+    def __init__(
+        self,
+        *,
+        kind: str,
+        kelas_id: Optional[int] = None,
+        user_ids: Optional[list[int]] = None,
+    ):
+        self.id = uuid4().hex
+        self.kind = kind
+        self.kelas_id = kelas_id
+        self.user_ids = user_ids
+        self.status = "queued"
+        self.total: int = 0
+        self.rendered: int = 0
+        self.reused: int = 0
+        self.updated: int = 0
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "kelas_id": self.kelas_id,
+            "total": self.total,
+            "rendered": self.rendered,
+            "reused": self.reused,
+            "updated": self.updated,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class SiswaMediaJobs:
+    """
+    Background pipeline for per-siswa files: siswa are read in keyset pages
+    of `batch_size`, each page goes to `worker` on the media pool (as many
+    pages at a time as the pool has workers) and the changed file names are
+    written back in one UPDATE per page. Jobs live in memory of the worker
+    process that started them.
+
+    **Parameters**
+
+    * `worker`: picklable `worker(payloads) -> list[MediaResult]`, runs in
+      the pool and skips files that already exist
+    * `payload`: builds the worker input of one siswa row
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        *,
+        worker: Callable[[list[Any]], list[MediaResult]],
+        payload: Callable[[Row], Any],
+        batch_size: int,
+        jobs_maxsize: int,
+    ):
+        self.kind = kind
+        self.worker = worker
+        self.payload = payload
+        self.batch_size = batch_size
+        self._jobs: LRUCache[str, MediaJob] = LRUCache(maxsize=jobs_maxsize)
+        self._tasks: set[asyncio.Task] = set()
+
+    async def shutdown(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def submit(
+        self, *, kelas_id: Optional[int] = None, user_ids: Optional[list[int]] = None
+    ) -> MediaJob:
+        """
+        Queue the siswa of `kelas_id`, the given `user_ids` or, with neither,
+        the whole school.
+        """
+        job = MediaJob(kind=self.kind, kelas_id=kelas_id, user_ids=user_ids)
+        self._jobs.set(job.id, job)
+        # NOTE: fresh context, the job outlives the request that started it
+        task = asyncio.create_task(self._run(job), context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[MediaJob]:
+        return self._jobs.get(job_id)
+
+    async def _run(self, job: MediaJob) -> None:
+        job.status = "running"
+        try:
+            await self._generate(job)
+            job.status = "done"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as error:
+            job.status = "failed"
+            job.error = str(error)
+            logger.exception("%s job %s failed", self.kind, job.id)
+        finally:
+            job.finished_at = datetime.now()
+
+    async def pages(
+        self, *, kelas_id: Optional[int] = None, user_ids: Optional[list[int]] = None
+    ) -> AsyncIterator[list[Row]]:
+        after_id = 0
+        while True:
+            async with SessionLocal() as db:
+                rows = await siswa_media_crud.read_siswa_media_page(
+                    db,
+                    after_id=after_id,
+                    limit=self.batch_size,
+                    kelas_id=kelas_id,
+                    user_ids=user_ids,
+                )
+            if not rows:
+                return
+            after_id = rows[-1].id
+            yield rows
+
+    async def _generate(self, job: MediaJob) -> None:
+        slots = asyncio.Semaphore(media_pool.workers)
+        batches: list[asyncio.Task] = []
+
+        async def batch(rows: list[Row]) -> None:
+            try:
+                await self.render(rows, job=job)
+            finally:
+                slots.release()
+
+        try:
+            async for rows in self.pages(kelas_id=job.kelas_id, user_ids=job.user_ids):
+                job.total += len(rows)
+                await slots.acquire()
+                batches.append(asyncio.create_task(batch(rows)))
+            await asyncio.gather(*batches)
+        finally:
+            for task in batches:
+                task.cancel()
+
+    async def render(
+        self, rows: list[Row], *, job: Optional[MediaJob] = None
+    ) -> list[MediaResult]:
+        """
+        Render one page on the media pool (split over its workers) and store
+        the changed file names.
+        """
+        payloads = [self.payload(row) for row in rows]
+        size = -(-len(payloads) // media_pool.workers)
+        parts = await asyncio.gather(
+            *(
+                media_pool.run(self.worker, payloads[i : i + size])
+                for i in range(0, len(payloads), size)
+            )
+        )
+        results: list[MediaResult] = [result for part in parts for result in part]
+
+        changes: dict[int, dict[str, str]] = {}
+        usernames: list[str] = []
+        for row, (names, rendered) in zip(rows, results):
+            if job is not None:
+                if rendered:
+                    job.rendered += 1
+                else:
+                    job.reused += 1
+            changed = {
+                column: name
+                for column, name in names.items()
+                if getattr(row, column) != name
+            }
+            if changed:
+                changes[row.id] = changed
+                usernames.append(row.username)
+
+        if changes:
+            async with SessionLocal() as db:
+                await siswa_media_crud.update_siswa_media(db, changes)
+                await db.commit()
+            invalidate_principal(*usernames)
+            if job is not None:
+                job.updated += len(changes)
+        return results
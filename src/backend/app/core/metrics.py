@@ -0,0 +1,243 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Optional
+from fastapi.routing import iter_route_contexts
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# upper bounds (seconds) of the request latency histogram
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class RequestScope:
+    """
+    Per-request counters filled by the engine events, reachable through
+    `current_request` from anywhere inside the request.
+    """
+
+    __slots__ = ("scope", "statements", "db_seconds", "limits", "shapes")
+
+    def __init__(self, scope: Scope) -> None:
+        self.scope = scope
+        self.statements: int = 0
+        self.db_seconds: float = 0.0
+        # (statement budget, repeat limit) of the route, `None` -> defaults
+        self.limits: Optional[tuple[Optional[int], Optional[int]]] = None
+        # statement text -> times executed, filled by app.db.diagnostics
+        self.shapes: Optional[dict[str, int]] = None
+
+
+current_request: ContextVar[Optional[RequestScope]] = ContextVar(
+    "current_request", default=None
+)
+
+
+class RouteMetrics:
+    __slots__ = ("statuses", "buckets", "latency_sum", "db_statements", "db_seconds")
+
+    def __init__(self) -> None:
+        self.statuses: dict[int, int] = {}
+        self.buckets: list[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum: float = 0.0
+        self.db_statements: int = 0
+        self.db_seconds: float = 0.0
+
+    def observe(self, status: int, seconds: float, request: RequestScope) -> None:
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.latency_sum += seconds
+        self.db_statements += request.statements
+        self.db_seconds += request.db_seconds
+
+
+# (method, route template) -> RouteMetrics
+route_metrics: dict[tuple[str, str], RouteMetrics] = {}
+# NOTE: the route is only known once routing ran, so in-flight is app wide
+in_flight: dict[str, int] = {"requests": 0}
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+# id(matched route) -> full path template, see `route_template`
+_route_paths: dict[int, str] = {}
+
+
+def route_template(scope: Scope) -> str:
+    """
+    `/api/v1/users/{user_id}` for `/api/v1/users/0b6f...`, the template of the
+    route the router matched (`scope["route"]`). 404s collapse into one label
+    to keep the label set bounded.
+    """
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    path = _route_paths.get(id(route))
+    if path is None:
+        # NOTE: `route.path` is relative to the router it was declared on, the
+        # prefixes of included routers are only known to the app
+        _route_paths.update(
+            (id(context.original_route), context.path)
+            for context in iter_route_contexts(scope["app"].routes)
+            if context.path
+        )
+        path = _route_paths.setdefault(
+            id(route), getattr(route, "path", None) or UNMATCHED_ROUTE
+        )
+    return path
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: counts, status codes and latency histogram per route
+    template, plus the DB statements / time of each request. No locks, no
+    allocations beyond one `RequestScope` per request.
+    """
+
+    def __init__(self, app: ASGIApp, *, exclude: Iterable[str] = ()) -> None:
+        self.app = app
+        self.exclude = set(exclude)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        request = RequestScope(scope)
+        token = current_request.set(request)
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight["requests"] += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight["requests"] -= 1
+            current_request.reset(token)
+
+            key = (scope["method"], route_template(scope))
+            metrics = route_metrics.get(key)
+            if metrics is None:
+                metrics = route_metrics[key] = RouteMetrics()
+            metrics.observe(status, elapsed, request)
+
+
+def track_statements(engine: AsyncEngine) -> None:
+    """
+    Count statements and time spent in the database per request, the totals
+    end up in `RequestScope` of the running request (if any).
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        request = current_request.get()
+        if request is not None:
+            request.statements += 1
+            request.db_seconds += time.perf_counter() - context._metrics_start
+
+
+# NOTE: Prometheus text exposition
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    return ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+
+
+def _family(lines: list[str], name: str, kind: str, help_text: str) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def render_route_metrics(lines: list[str]) -> None:
+    items = sorted(route_metrics.items())
+
+    _family(lines, "http_requests_total", "counter", "Requests by route and status")
+    for (method, route), metrics in items:
+        for status, count in sorted(metrics.statuses.items()):
+            labels = _labels(method=method, route=route, status=status)
+            lines.append(f"http_requests_total{{{labels}}} {count}")
+
+    _family(lines, "http_requests_in_flight", "gauge", "Requests currently in progress")
+    lines.append(f"http_requests_in_flight {in_flight['requests']}")
+
+    _family(
+        lines,
+        "http_request_duration_seconds",
+        "histogram",
+        "Request latency by route",
+    )
+    for (method, route), metrics in items:
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), metrics.buckets):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else f"{bound:g}"
+            labels = _labels(method=method, route=route, le=le)
+            lines.append(
+                f"http_request_duration_seconds_bucket{{{labels}}} {cumulative}"
+            )
+        labels = _labels(method=method, route=route)
+        lines.append(
+            f"http_request_duration_seconds_sum{{{labels}}} {metrics.latency_sum:.6f}"
+        )
+        lines.append(f"http_request_duration_seconds_count{{{labels}}} {cumulative}")
+
+    _family(lines, "db_statements_total", "counter", "SQL statements by route")
+    for (method, route), metrics in items:
+        labels = _labels(method=method, route=route)
+        lines.append(f"db_statements_total{{{labels}}} {metrics.db_statements}")
+
+    _family(lines, "db_seconds_total", "counter", "Time spent in SQL by route")
+    for (method, route), metrics in items:
+        labels = _labels(method=method, route=route)
+        lines.append(f"db_seconds_total{{{labels}}} {metrics.db_seconds:.6f}")
+
+
+def render_gauges(
+    lines: list[str],
+    name: str,
+    help_text: str,
+    samples: Iterable[tuple[dict[str, Any], Any]],
+) -> None:
+    """
+    One gauge family out of `(labels, value)` samples, e.g. the stats of the
+    pool, admission controls or caches. Non numeric values are skipped.
+    """
+    _family(lines, name, "gauge", help_text)
+    for labels, value in samples:
+        if isinstance(value, (int, float)):
+            lines.append(f"{name}{{{_labels(**labels)}}} {value}")
+
+
+def render(*collectors: Callable[[list[str]], None]) -> str:
+    lines: list[str] = []
+    render_route_metrics(lines)
+    for collect in collectors:
+        collect(lines)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,21 @@
+import base64
+import json
+from typing import Any
+from fastapi import HTTPException
+
+
+# NOTE: opaque keyset cursor -> urlsafe base64 of the last row's sort key
+def encode_cursor(data: dict[str, Any]) -> str:
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor not valid.")
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="Cursor not valid.")
+    return data
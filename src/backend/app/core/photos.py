@@ -0,0 +1,58 @@
+import os
+from typing import Any
+from app.core.media import media_directory, save_atomic
+
+# NOTE: stored photo (longest side) and the thumbnails made from it, the
+# names follow `<digest>.jpg` / `<digest>_<size>.jpg`
+PHOTO_RENDER: dict[str, Any] = {"max_size": 1600, "quality": 88}
+PHOTO_VARIANTS = (128, 512)
+
+
+def photo_variant_name(name: str, size: int) -> str:
+    stem, ext = os.path.splitext(name)
+    return f"{stem}_{size}{ext}"
+
+
+def process_photo(upload_path: str, sha256: str) -> str:
+    """
+    Runs in the media pool: decode the upload, drop EXIF (orientation is
+    applied first), store it as jpeg plus the `PHOTO_VARIANTS` thumbnails.
+    Returns the photo name, raises `ValueError` when it's not an image.
+    """
+    try:
+        from PIL import Image, ImageOps, UnidentifiedImageError
+    except ImportError:
+        raise RuntimeError("Photo processing needs `pillow` installed.")
+
+    directory = media_directory("photos")
+    name = f"{sha256[:32]}.jpg"
+    paths = [os.path.join(directory, name)] + [
+        os.path.join(directory, photo_variant_name(name, size))
+        for size in PHOTO_VARIANTS
+    ]
+    try:
+        # NOTE: same upload again, everything is on disk already
+        if all(os.path.exists(path) for path in paths):
+            return name
+
+        try:
+            with Image.open(upload_path) as image:
+                image = ImageOps.exif_transpose(image).convert("RGB")
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+            raise ValueError("File is not a supported image.")
+
+        image.thumbnail((PHOTO_RENDER["max_size"],) * 2)
+        save_atomic(
+            image,
+            paths[0],
+            format="JPEG",
+            quality=PHOTO_RENDER["quality"],
+            optimize=True,
+        )
+        for size, path in zip(PHOTO_VARIANTS, paths[1:]):
+            variant = image.copy()
+            variant.thumbnail((size, size))
+            save_atomic(variant, path, format="JPEG", quality=PHOTO_RENDER["quality"])
+        return name
+    finally:
+        os.remove(upload_path)
@@ -0,0 +1,85 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+
+def process_pool_context() -> multiprocessing.context.BaseContext:
+    """
+    Start method of the process pools. The default `fork` would copy the
+    event loop, threadpool and DB pool threads of a running worker, so the
+    workers come from a clean `forkserver` (`spawn` where there is none).
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+
+
+class ProcessPool:
+    """
+    Process pool for CPU bound jobs so they never block the event loop. At
+    most `max_concurrency` jobs are in flight, the rest wait in the queue.
+    """
+
+    def __init__(self, *, workers: int, max_concurrency: int):
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self._executor: ProcessPoolExecutor | None = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.queue_depth: int = 0
+        self.max_queue_depth: int = 0
+        self.in_flight: int = 0
+        self.completed: int = 0
+
+    def start(self) -> None:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=process_pool_context()
+            )
+
+    async def warm_up(self, func: Callable[..., Any] = os.getpid, *args: Any) -> None:
+        # NOTE: workers are started on the first job, do it at startup instead
+        # of on the first request
+        self.start()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(self._executor, func, *args)
+                for _ in range(self.workers)
+            )
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        self.start()
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queue_depth -= 1
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+        }
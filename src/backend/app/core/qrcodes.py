@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+from typing import Any
+from sqlalchemy import Row
+from app.core import settings
+from app.core.media import MediaResult, SiswaMediaJobs, media_directory, save_atomic
+
+# NOTE: part of the file name, changing it renders every QR code again
+QR_RENDER: dict[str, Any] = {"error_correction": "M", "box_size": 10, "border": 4}
+
+
+def qr_filename(payload: str) -> str:
+    """
+    Content addressed name of the QR image of `payload`, same payload and
+    render settings -> same file.
+    """
+    key = json.dumps([payload, QR_RENDER], sort_keys=True)
+    return f"{hashlib.sha256(key.encode()).hexdigest()[:32]}.png"
+
+
+def render_qr_code(payload: str) -> tuple[str, bool]:
+    """
+    Write the QR image of `payload` unless it exists, returns
+    `(file name, rendered)`. Runs in the media pool.
+    """
+    try:
+        import qrcode
+        from qrcode import constants
+    except ImportError:
+        raise RuntimeError("QR generation needs `qrcode[pil]` installed.")
+
+    name = qr_filename(payload)
+    path = os.path.join(media_directory("qr"), name)
+    if os.path.exists(path):
+        return name, False
+
+    qr = qrcode.QRCode(
+        error_correction=getattr(
+            constants, f"ERROR_CORRECT_{QR_RENDER['error_correction']}"
+        ),
+        box_size=QR_RENDER["box_size"],
+        border=QR_RENDER["border"],
+    )
+    qr.add_data(payload)
+    qr.make(fit=True)
+    save_atomic(qr.make_image(), path, format="PNG")
+    return name, True
+
+
+def render_qr_codes(payloads: list[str]) -> list[MediaResult]:
+    results: list[MediaResult] = []
+    for payload in payloads:
+        name, rendered = render_qr_code(payload)
+        results.append(({"qr_name": name}, rendered))
+    return results
+
+
+def qr_payload(row: Row) -> str:
+    # NOTE: the uuid of the siswa, resolved by POST /absensi/scan
+    return str(row.uuid)
+
+
+qr_jobs = SiswaMediaJobs(
+    "qr",
+    worker=render_qr_codes,
+    payload=qr_payload,
+    batch_size=settings.MEDIA_BATCH_SIZE,
+    jobs_maxsize=settings.MEDIA_JOBS_MAXSIZE,
+)
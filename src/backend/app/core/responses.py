@@ -0,0 +1,79 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_dumps(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, default=str, separators=(",", ":")).encode()
+
+
+def json_response(data: Any, *, status_code: int = 200, **kwargs: Any) -> Response:
+    """
+    Encode already serialized data straight to bytes, skipping the
+    `response_model` validation pass. Use only with data built to match it.
+    """
+    return Response(
+        content=json_dumps(data),
+        status_code=status_code,
+        media_type="application/json",
+        **kwargs,
+    )
+
+
+def make_etag(content: bytes) -> str:
+    return f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    `If-None-Match` uses the weak comparison, so `W/"x"` matches `"x"`.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+def not_modified_response(headers: dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+# NOTE: naive DB timestamps are sent as-is in GMT, only round trips matter
+def http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def is_not_modified(
+    *,
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+    etag: str,
+    last_modified: Optional[datetime] = None,
+) -> bool:
+    # If-Modified-Since is ignored when If-None-Match is present (RFC 9110)
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+        return modified <= since
+    return False
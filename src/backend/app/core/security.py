@@ -1,8 +1,12 @@
+import asyncio
+import hashlib
+import secrets
 from datetime import datetime, timedelta
 from typing import Generator
 from jose import jwt
 from werkzeug.security import generate_password_hash, check_password_hash
 from app.core import settings
+from app.core.process_pool import ProcessPool
 
 
 # NOTE: generate password_hash
@@ -15,6 +19,60 @@ def password_hash_check(password, password_hash):
     return check_password_hash(pwhash=password_hash, password=password)
 
 
+class PasswordHasher(ProcessPool):
+    """
+    Runs werkzeug's password hashing/verification (scrypt by default) on a
+    process pool. Bulk jobs (`hash_many`) take at most `bulk_concurrency` of
+    its `max_concurrency` slots.
+    """
+
+    def __init__(self, *, workers: int, max_concurrency: int, bulk_concurrency: int):
+        super().__init__(workers=workers, max_concurrency=max_concurrency)
+        self.bulk_concurrency = bulk_concurrency
+        self._bulk_semaphore = asyncio.Semaphore(bulk_concurrency)
+        self.bulk_queue_depth: int = 0
+
+    async def hash(self, password: str) -> str:
+        return await self.run(generate_password_hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self.run(check_password_hash, password_hash, password)
+
+    async def hash_many(self, passwords: list[str]) -> list[str]:
+        """
+        Lower priority lane for imports, logins keep the other
+        `max_concurrency - bulk_concurrency` slots however big the import is.
+        """
+
+        async def _hash(password: str) -> str:
+            self.bulk_queue_depth += 1
+            try:
+                await self._bulk_semaphore.acquire()
+            finally:
+                self.bulk_queue_depth -= 1
+            try:
+                return await self.hash(password)
+            finally:
+                self._bulk_semaphore.release()
+
+        return list(await asyncio.gather(*(_hash(password) for password in passwords)))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            **super().stats(),
+            "bulk_concurrency": self.bulk_concurrency,
+            "bulk_queue_depth": self.bulk_queue_depth,
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_concurrency=settings.PASSWORD_HASH_MAX_CONCURRENCY,
+    bulk_concurrency=settings.PASSWORD_HASH_BULK_CONCURRENCY
+    or max(settings.PASSWORD_HASH_WORKERS - 1, 1),
+)
+
+
 ALGORITHM = "HS256"
 
 
@@ -33,18 +91,36 @@ def create_access_token(*, identity: str | dict, expire_delta: timedelta = None)
     return jwt_encode
 
 
-def create_refresh_token(*, identity: str | dict, expire_delta: timedelta = None):
+REFRESH_TOKEN_TYPE = "refresh"
+
+
+def new_session_id() -> str:
+    return secrets.token_urlsafe(16)
+
+
+def create_refresh_token(
+    *, identity: str | dict, session_id: str, expire_delta: timedelta = None
+):
     expire = (
         datetime.now() + expire_delta
         if expire_delta
-        else datetime.now() + timedelta(minutes=settings.EXPIRE_TIMEDELTA_MINUTE)
+        else datetime.now()
+        + timedelta(minutes=settings.REFRESH_EXPIRE_TIMEDETLA_MINUTE)
     )
 
-    if isinstance(identity, str):
-        to_encode = {"exp": expire, "identity": identity}
-        jwt_encode = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
-    if isinstance(identity, dict):
-        to_encode = {"exp": expire, "identity": identity}
-        jwt_encode = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+    # NOTE: `jti` makes every rotated token unique, `sid` names the login it
+    # was rotated from, `type` keeps it out of the access token path
+    to_encode = {
+        "exp": expire,
+        "identity": identity,
+        "type": REFRESH_TOKEN_TYPE,
+        "sid": session_id,
+        "jti": secrets.token_urlsafe(16),
+    }
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
 
-    return jwt_encode
+
+# NOTE: only the digest of a refresh token is stored, a plain sha256 is enough
+# for a high entropy token and keeps the refresh path off the password hasher
+def hash_refresh_token(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
@@ -0,0 +1,36 @@
+import csv
+import io
+from typing import Any
+from fastapi import HTTPException
+
+
+def read_tabular_rows(filename: str, content: bytes) -> list[dict[str, Any]]:
+    """
+    Read a `.csv` or `.xlsx` upload into a list of dicts keyed by the header row.
+    """
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        text = content.decode("utf-8-sig")
+        return [dict(row) for row in csv.DictReader(io.StringIO(text))]
+
+    if name.endswith(".xlsx"):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise HTTPException(
+                status_code=415, detail="XLSX upload needs `openpyxl` installed."
+            )
+        workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [
+            str(cell).strip() if cell is not None else "" for cell in next(rows, [])
+        ]
+        data = [
+            dict(zip(header, row))
+            for row in rows
+            if any(cell is not None for cell in row)
+        ]
+        workbook.close()
+        return data
+
+    raise HTTPException(status_code=415, detail="Only .csv or .xlsx file is supported.")
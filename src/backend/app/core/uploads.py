@@ -0,0 +1,125 @@
+import asyncio
+import hashlib
+import os
+from typing import Optional
+from uuid import uuid4
+from fastapi import HTTPException, Request
+from python_multipart import MultipartParser
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import parse_options_header
+from app.core.media import media_directory
+
+
+class StreamedUpload:
+    """
+    One file field of a multipart body, already on disk under
+    `MEDIA_ROOT/tmp`. The caller moves or removes `path`.
+    """
+
+    def __init__(self, *, path: str, filename: Optional[str], sha256: str, size: int):
+        self.path = path
+        self.filename = filename
+        self.sha256 = sha256
+        self.size = size
+
+    def discard(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+async def receive_upload(
+    request: Request, *, field: str, max_bytes: int
+) -> StreamedUpload:
+    """
+    Stream the `field` file of a `multipart/form-data` body to a temporary
+    file while hashing it, one network chunk in memory at a time (no
+    spooling of the whole body). Other fields are ignored, more than
+    `max_bytes` -> 413 without reading the rest.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=415, detail="Expected multipart/form-data.")
+
+    path = os.path.join(media_directory("tmp"), uuid4().hex)
+    digest = hashlib.sha256()
+    state = {"field": False, "found": False, "filename": None, "size": 0}
+    header: dict[str, bytes] = {}
+    pending: list[bytes] = []
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header["field"] = header.get("field", b"") + data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header["value"] = header.get("value", b"") + data[start:end]
+
+    def on_header_end() -> None:
+        if header.get("field", b"").lower() == b"content-disposition":
+            _, options = parse_options_header(header.get("value", b""))
+            is_field = options.get(b"name") == field.encode()
+            state["field"] = is_field and not state["found"]
+            if state["field"]:
+                state["found"] = True
+                filename = options.get(b"filename")
+                state["filename"] = (
+                    filename.decode("utf-8", "replace") if filename else None
+                )
+        header.clear()
+
+    def on_part_begin() -> None:
+        state["field"] = False
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        if state["field"]:
+            pending.append(data[start:end])
+
+    parser = MultipartParser(
+        params[b"boundary"],
+        {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_part_data": on_part_data,
+        },
+    )
+
+    file = await asyncio.to_thread(open, path, "wb")
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if not pending:
+                continue
+
+            data = b"".join(pending)
+            pending.clear()
+            state["size"] += len(data)
+            if state["size"] > max_bytes:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File is larger than {max_bytes // (1024 * 1024)} MB.",
+                )
+            digest.update(data)
+            await asyncio.to_thread(file.write, data)
+        parser.finalize()
+    except MultipartParseError:
+        file.close()
+        os.remove(path)
+        raise HTTPException(status_code=400, detail="Malformed multipart body.")
+    except BaseException:
+        file.close()
+        os.remove(path)
+        raise
+    await asyncio.to_thread(file.close)
+
+    upload = StreamedUpload(
+        path=path,
+        filename=state["filename"],
+        sha256=digest.hexdigest(),
+        size=state["size"],
+    )
+    if not state["found"] or not upload.size:
+        upload.discard()
+        raise HTTPException(status_code=400, detail=f"Missing `{field}` file.")
+    return upload
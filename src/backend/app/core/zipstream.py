@@ -0,0 +1,48 @@
+import asyncio
+import zipfile
+from typing import AsyncIterator
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkSink:
+    """
+    Write-only file for `zipfile`: no `tell`/`seek`, so the archive is
+    written sequentially with data descriptors, bytes wait here until the
+    response drains them.
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_zip(
+    entries: AsyncIterator[tuple[str, str]], *, chunk_size: int = CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """
+    Stream a ZIP of `(archive name, file path)` entries, one chunk of one
+    file in memory at a time. Entries are stored, not deflated, they are
+    images that are compressed already.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        async for arcname, path in entries:
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            with archive.open(info, "w") as entry, open(path, "rb") as file:
+                while chunk := await asyncio.to_thread(file.read, chunk_size):
+                    entry.write(chunk)
+                    yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,50 @@
+from datetime import date
+from typing import Any, Iterable
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.absensi_model import AbsensiModel
+from app.models.user_model import RoleEnum, UserModel
+
+
+async def read_siswa_ids(db: AsyncSession, uuids: Iterable[UUID]) -> dict[UUID, int]:
+    """
+    uuid -> user id of the active siswa among `uuids`, one statement for the
+    whole batch of scans.
+    """
+    query = await db.execute(
+        select(UserModel.uuid, UserModel.id).where(
+            UserModel.uuid.in_(list(uuids)),
+            UserModel.role == RoleEnum.siwsa,
+            UserModel.is_active.is_(True),
+        )
+    )
+    return {row.uuid: row.id for row in query}
+
+
+async def read_present_user_ids(db: AsyncSession, tanggal: date) -> set[int]:
+    query = await db.execute(
+        select(AbsensiModel.user_id).where(AbsensiModel.tanggal == tanggal)
+    )
+    return set(query.scalars())
+
+
+async def insert_absensi(db: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    """
+    Insert scans as one executemany (`INSERT IGNORE ... VALUES (...), (...)` on
+    mysql). Rows that already exist for the siswa and day are skipped by the
+    unique index, so flushes from several workers can't double count.
+    The caller commits.
+    """
+    # NOTE: core insert on the table, ORM bulk insert adds nothing here
+    table = AbsensiModel.__table__
+    # NOTE: sqlite is only used by local tooling, production runs on mysql
+    if db.get_bind().dialect.name == "sqlite":
+        stmt = sqlite.insert(table).on_conflict_do_nothing(
+            index_elements=["user_id", "tanggal"]
+        )
+    else:
+        stmt = mysql.insert(table).prefix_with("IGNORE")
+    await db.execute(stmt, rows)
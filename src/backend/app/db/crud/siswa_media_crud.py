@@ -0,0 +1,78 @@
+from typing import Optional
+from sqlalchemy import Row, case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.datum_model import KelasModel
+from app.models.user_model import UserDetailSiswa, UserModel
+
+# NOTE: tb_detail_siswa columns holding generated file names
+MEDIA_COLUMNS = ("qr_name", "photo_name", "idcard_name")
+
+
+async def read_siswa_media_page(
+    db: AsyncSession,
+    *,
+    after_id: int,
+    limit: int,
+    kelas_id: Optional[int] = None,
+    user_ids: Optional[list[int]] = None,
+) -> list[Row]:
+    """
+    Next `limit` siswa by user id (keyset), with what the QR code and ID card
+    need: `id, uuid, username, full_name, kelas` plus the media columns.
+    """
+    stmt = (
+        select(
+            UserModel.id,
+            UserModel.uuid,
+            UserModel.username,
+            UserModel.full_name,
+            KelasModel.kelas,
+            *(getattr(UserDetailSiswa, column) for column in MEDIA_COLUMNS),
+        )
+        .join(UserDetailSiswa, UserDetailSiswa.user_id == UserModel.id)
+        .outerjoin(KelasModel, KelasModel.id == UserDetailSiswa.kelas_id)
+        .where(UserModel.id > after_id)
+        .order_by(UserModel.id)
+        .limit(limit)
+    )
+    if kelas_id is not None:
+        stmt = stmt.where(UserDetailSiswa.kelas_id == kelas_id)
+    if user_ids is not None:
+        stmt = stmt.where(UserModel.id.in_(user_ids))
+    query = await db.execute(stmt)
+    return list(query.all())
+
+
+async def update_siswa_media(
+    db: AsyncSession, changes: dict[int, dict[str, str]]
+) -> None:
+    """
+    Set media columns of many siswa (user id -> {column: name}) in one
+    `UPDATE ... SET qr_name = CASE user_id WHEN ... END, ...` and touch the
+    users' `updated_at` so their validators change. The caller commits.
+    """
+    user_ids = list(changes)
+    values = {}
+    for column in MEDIA_COLUMNS:
+        names = {
+            user_id: columns[column]
+            for user_id, columns in changes.items()
+            if column in columns
+        }
+        if names:
+            attribute = getattr(UserDetailSiswa, column)
+            values[column] = case(names, value=UserDetailSiswa.user_id, else_=attribute)
+
+    await db.execute(
+        update(UserDetailSiswa)
+        .where(UserDetailSiswa.user_id.in_(user_ids))
+        .values(values)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        update(UserModel)
+        .where(UserModel.id.in_(user_ids))
+        .values(updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
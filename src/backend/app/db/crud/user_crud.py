@@ -1,14 +1,212 @@
+from datetime import datetime, timedelta
 from typing import Optional
+from sqlalchemy.dialects import mysql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, delete, insert, or_, select, update
+from sqlalchemy.orm import joinedload, raiseload
+from sqlalchemy.sql.base import ExecutableOption
 
-from backend.app.models.user_model import UserModel
-from backend.app.schemas.user_schema import UserCreateSchm, UserUpdateSchm
+from app.models.user_model import (
+    GenderEnum,
+    RoleEnum,
+    UserDetailAdmin,
+    UserDetailGuru,
+    UserDetailSiswa,
+    UserLoginModel,
+    UserModel,
+    UserSessionModel,
+)
+from app.core import settings
+from app.schemas.user_schema import UpdateUserSchema, UserCreateSchm
 from .base_crud import CRUDBase
-from app.core.security import password_hash_check
+from app.core.security import (
+    create_refresh_token,
+    hash_refresh_token,
+    password_hasher,
+)
 
+# role -> (detail relationship, stored enum member)
+ROLE_DETAILS = {
+    "admin": (UserModel.admin, RoleEnum.admin),
+    "guru": (UserModel.guru, RoleEnum.guru),
+    "siswa": (UserModel.siswa, RoleEnum.siwsa),
+}
 
-class CRUDUser(CRUDBase[UserModel, UserCreateSchm, UserUpdateSchm]):
+
+def user_detail_options(role: Optional[str] = None) -> list[ExecutableOption]:
+    """
+    Loader options that fetch a user together with its role detail row in
+    the same statement. With a known `role` only that detail table is joined,
+    otherwise each detail join is restricted to rows whose `role` matches so
+    an admin never pulls a siswa row. Anything else raises instead of
+    lazy loading.
+    """
+    roles = [role] if role else list(ROLE_DETAILS)
+    options: list[ExecutableOption] = []
+    for name in roles:
+        relation, role_value = ROLE_DETAILS[name]
+        if not role:
+            relation = relation.and_(UserModel.role == role_value)
+        loader = joinedload(relation)
+        if name == "siswa":
+            loader = loader.joinedload(UserDetailSiswa.kelas)
+        options.append(loader)
+    options.append(raiseload("*"))
+    return options
+
+
+def user_list_filters(
+    *,
+    role: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    kelas_id: Optional[int] = None,
+    gender: Optional[GenderEnum] = None,
+) -> list[ColumnElement[bool]]:
+    """
+    WHERE clauses for the users listing, served by the
+    `tb_users(role, is_active, id)` and `tb_detail_siswa(kelas_id, user_id)`
+    indexes.
+    """
+    filters: list[ColumnElement[bool]] = []
+    if role:
+        filters.append(UserModel.role == ROLE_DETAILS[role][1])
+    if is_active is not None:
+        filters.append(UserModel.is_active == is_active)
+    if kelas_id is not None:
+        filters.append(
+            UserModel.id.in_(
+                select(UserDetailSiswa.user_id).filter(
+                    UserDetailSiswa.kelas_id == kelas_id
+                )
+            )
+        )
+    if gender:
+        # tb_detail_admin stores the gender value, the others the enum name
+        by_role = {
+            "admin": UserModel.admin.has(UserDetailAdmin.gender == gender.value),
+            "guru": UserModel.guru.has(UserDetailGuru.gender == gender),
+            "siswa": UserModel.siswa.has(UserDetailSiswa.gender == gender),
+        }
+        filters.append(by_role[role] if role else or_(*by_role.values()))
+    return filters
+
+
+async def record_login(
+    db: AsyncSession, *, user_id: int, session_id: str, refresh_token: str
+) -> None:
+    """
+    Open the `tb_user_session` row of a new login and create or bump the
+    `tb_user_login` row of the user in one atomic statement
+    (`INSERT ... ON DUPLICATE KEY UPDATE`), relies on the unique index on
+    `user_id`. Expired sessions of the user are dropped. The caller commits.
+    """
+    now = datetime.now()
+    expire_token = now + timedelta(minutes=settings.REFRESH_EXPIRE_TIMEDETLA_MINUTE)
+    await db.execute(
+        delete(UserSessionModel)
+        .filter(
+            UserSessionModel.user_id == user_id,
+            UserSessionModel.expire_token <= now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        insert(UserSessionModel).values(
+            session_id=session_id,
+            refresh_token_hash=hash_refresh_token(refresh_token),
+            user_id=user_id,
+            expire_token=expire_token,
+            created_at=now,
+        )
+    )
+
+    values = {
+        "user_id": user_id,
+        "expire_token": expire_token,
+        "counter_login": 1,
+        "last_login_at": now,
+    }
+    bumped = {
+        "counter_login": UserLoginModel.counter_login + 1,
+        "expire_token": values["expire_token"],
+        "last_login_at": values["last_login_at"],
+    }
+
+    # NOTE: sqlite is only used by local tooling, production runs on mysql
+    if db.get_bind().dialect.name == "sqlite":
+        stmt = (
+            sqlite.insert(UserLoginModel)
+            .values(values)
+            .on_conflict_do_update(index_elements=["user_id"], set_=bumped)
+        )
+    else:
+        stmt = mysql.insert(UserLoginModel).values(values)
+        stmt = stmt.on_duplicate_key_update(bumped)
+    await db.execute(stmt)
+
+
+async def rotate_refresh_token(
+    db: AsyncSession, *, session_id: str, refresh_token: str
+) -> Optional[tuple[str, str]]:
+    """
+    Swap the stored digest of `refresh_token` in its session for a freshly
+    issued one and return `(username, new refresh token)`. `None` means the
+    session is unknown, revoked or expired, the token is not its newest one
+    or the user is inactive. The swap is a compare-and-set on the old digest,
+    so of two concurrent refreshes with the same token only one wins. The
+    caller commits.
+    """
+    old_hash = hash_refresh_token(refresh_token)
+    now = datetime.now()
+    query = await db.execute(
+        select(UserSessionModel.id, UserModel.username)
+        .join(UserModel, UserModel.id == UserSessionModel.user_id)
+        .filter(
+            UserSessionModel.session_id == session_id,
+            UserSessionModel.refresh_token_hash == old_hash,
+            UserSessionModel.expire_token > now,
+            UserModel.is_active.is_(True),
+        )
+    )
+    row = query.first()
+    if not row:
+        return None
+
+    # identity follows the current username, it may have changed since login
+    new_refresh_token = create_refresh_token(
+        identity={"username": row.username}, session_id=session_id
+    )
+    result = await db.execute(
+        update(UserSessionModel)
+        .filter(
+            UserSessionModel.id == row.id,
+            UserSessionModel.refresh_token_hash == old_hash,
+        )
+        .values(
+            refresh_token_hash=hash_refresh_token(new_refresh_token),
+            expire_token=now
+            + timedelta(minutes=settings.REFRESH_EXPIRE_TIMEDETLA_MINUTE),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return None
+    return row.username, new_refresh_token
+
+
+async def revoke_refresh_token(db: AsyncSession, *, session_id: str) -> None:
+    """
+    Drop the session `session_id`, every refresh token of that login stops
+    working. Other sessions of the user are kept. The caller commits.
+    """
+    await db.execute(
+        delete(UserSessionModel)
+        .filter(UserSessionModel.session_id == session_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class CRUDUser(CRUDBase[UserModel, UserCreateSchm, UpdateUserSchema]):
     async def authenticate(
         self, db: AsyncSession, *, username: str, password: str
     ) -> Optional[UserModel]:
@@ -16,7 +214,7 @@ class CRUDUser(CRUDBase[UserModel, UserCreateSchm, UserUpdateSchm]):
         user = db_stmt.scalar()
         if not user:
             return None
-        if not password_hash_check(password, user.hashed_password):
+        if not await password_hasher.verify(password, user.hashed_password):
             return None
         return user
 
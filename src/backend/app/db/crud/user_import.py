@@ -0,0 +1,232 @@
+from typing import Any
+from uuid import uuid4
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import password_hasher
+from app.db.crud.user_crud import ROLE_DETAILS
+from app.models.datum_model import KelasModel
+from app.models.user_model import (
+    UserDetailAdmin,
+    UserDetailGuru,
+    UserDetailSiswa,
+    UserModel,
+)
+from app.schemas.user_schema import CreateAllUserSchema
+
+IMPORT_CHUNK_SIZE = 500
+IMPORT_MAX_ROWS = 5000
+DETAIL_MODELS = {
+    "admin": UserDetailAdmin,
+    "guru": UserDetailGuru,
+    "siswa": UserDetailSiswa,
+}
+DETAIL_FIELDS = {
+    "admin": ["gender", "agama", "alamat", "telp"],
+    "guru": ["gender", "agama", "alamat", "telp"],
+    "siswa": [
+        "gender",
+        "tempat_lahir",
+        "tgl_lahir",
+        "agama",
+        "nama_ortu",
+        "alamat",
+        "telp",
+        "kelas_id",
+    ],
+}
+
+
+def nest_flat_row(row: dict[str, Any]) -> dict[str, Any]:
+    """
+    Turn a flat CSV/XLSX row (user columns + detail columns) into the
+    `CreateAllUserSchema` shape.
+    """
+    data = {key: value for key, value in row.items() if value not in ("", None)}
+    role = str(data.get("role", "")).strip().lower()
+    nested: dict[str, Any] = {
+        "username": data.get("username"),
+        "password": data.get("password"),
+        "full_name": data.get("full_name"),
+        "role": role,
+        "is_active": str(data.get("is_active", "true")).strip().lower()
+        in ("1", "true", "yes", "y"),
+    }
+    if role in DETAIL_FIELDS:
+        # NOTE: a missing column is an empty value, not a missing field
+        nested[role] = {field: data.get(field) for field in DETAIL_FIELDS[role]}
+    return nested
+
+
+def _username_taken(username: str) -> str:
+    return f"The user with username : {username} already exists."
+
+
+def _chunks(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+async def _insert_chunk(
+    db: AsyncSession, rows: list[tuple[int, CreateAllUserSchema, str]]
+) -> None:
+    await db.execute(
+        insert(UserModel),
+        [
+            {
+                "uuid": uuid4(),
+                "username": user.username,
+                "hashed_password": hashed,
+                "full_name": user.full_name,
+                "role": ROLE_DETAILS[user.role][1],
+                "is_active": user.is_active,
+            }
+            for _, user, hashed in rows
+        ],
+    )
+    query = await db.execute(
+        select(UserModel.username, UserModel.id).filter(
+            UserModel.username.in_([user.username for _, user, _ in rows])
+        )
+    )
+    user_ids: dict[str, int] = dict(query.all())
+
+    details: dict[str, list[dict[str, Any]]] = {role: [] for role in DETAIL_MODELS}
+    for _, user, _ in rows:
+        role = user.role.value
+        detail = getattr(user, role).model_dump(exclude_none=True)
+        details[role].append({**detail, "user_id": user_ids[user.username]})
+    for role, values in details.items():
+        if values:
+            await db.execute(insert(DETAIL_MODELS[role]), values)
+
+
+async def _drop_taken(
+    db: AsyncSession,
+    rows: list[tuple[int, CreateAllUserSchema, str]],
+    report: list[dict[str, Any]],
+) -> list[tuple[int, CreateAllUserSchema, str]]:
+    """
+    After an `IntegrityError`: report the usernames created concurrently since
+    the set-based check and return the rows that can still be inserted.
+    """
+    query = await db.execute(
+        select(UserModel.username).filter(
+            UserModel.username.in_([user.username for _, user, _ in rows])
+        )
+    )
+    taken = set(query.scalars())
+    if not taken:
+        # NOTE: not a username race, a retry would fail the same way
+        for i, _, _ in rows:
+            report[i].update(status="error", detail="Could not insert the row.")
+        return []
+
+    for i, user, _ in rows:
+        if user.username in taken:
+            report[i].update(status="conflict", detail=_username_taken(user.username))
+    return [row for row in rows if row[1].username not in taken]
+
+
+async def bulk_create_users(
+    db: AsyncSession, rows: list[dict[str, Any]]
+) -> dict[str, Any]:
+    """
+    Create many users at once and return a per-row report.
+
+    Username and kelas checks are set-based, passwords are hashed in parallel
+    on the bulk lane of the hashing pool, and users + detail rows are inserted
+    with executemany in chunks of `IMPORT_CHUNK_SIZE`, one commit per chunk.
+    A username taken concurrently is reported as a `conflict` row, the rest of
+    its chunk is still created.
+    """
+    report: list[dict[str, Any]] = [
+        {"row": i, "username": row.get("username"), "status": None}
+        for i, row in enumerate(rows)
+    ]
+
+    # NOTE: validate rows
+    valid: list[tuple[int, CreateAllUserSchema]] = []
+    seen: set[str] = set()
+    for i, row in enumerate(rows):
+        try:
+            user = CreateAllUserSchema(**row)
+        except ValidationError as e:
+            report[i].update(
+                status="invalid",
+                detail=[
+                    f"{'.'.join(map(str, err['loc']))}: {err['msg']}"
+                    for err in e.errors()
+                ],
+            )
+            continue
+        if getattr(user, user.role.value) is None:
+            report[i].update(
+                status="invalid", detail=f"`{user.role.value}` detail is required."
+            )
+            continue
+        if user.username in seen:
+            report[i].update(status="conflict", detail="Duplicate username in file.")
+            continue
+        seen.add(user.username)
+        valid.append((i, user))
+
+    # NOTE: set-based conflict & kelas check
+    existing: set[str] = set()
+    for names in _chunks([user.username for _, user in valid], IMPORT_CHUNK_SIZE):
+        query = await db.execute(
+            select(UserModel.username).filter(UserModel.username.in_(names))
+        )
+        existing.update(query.scalars())
+
+    kelas_ids = {
+        user.siswa.kelas_id for _, user in valid if user.siswa and user.siswa.kelas_id
+    }
+    known_kelas: set[int] = set()
+    if kelas_ids:
+        query = await db.execute(
+            select(KelasModel.id).filter(KelasModel.id.in_(kelas_ids))
+        )
+        known_kelas.update(query.scalars())
+
+    to_create: list[tuple[int, CreateAllUserSchema]] = []
+    for i, user in valid:
+        if user.username in existing:
+            report[i].update(status="conflict", detail=_username_taken(user.username))
+        elif (
+            user.siswa
+            and user.siswa.kelas_id
+            and user.siswa.kelas_id not in known_kelas
+        ):
+            report[i].update(
+                status="invalid", detail=f"Kelas {user.siswa.kelas_id} not found."
+            )
+        else:
+            to_create.append((i, user))
+
+    # NOTE: give the connection back, hashing a chunk takes seconds and every
+    # chunk commits (and releases it) before the next one is hashed
+    await db.rollback()
+
+    # NOTE: insert in chunks
+    for chunk in _chunks(to_create, IMPORT_CHUNK_SIZE):
+        hashes = await password_hasher.hash_many([user.password for _, user in chunk])
+        pending = [(i, user, hashed) for (i, user), hashed in zip(chunk, hashes)]
+        while pending:
+            try:
+                await _insert_chunk(db, pending)
+                await db.commit()
+            except IntegrityError:
+                await db.rollback()
+                pending = await _drop_taken(db, pending, report)
+                continue
+            for i, _, _ in pending:
+                report[i].update(status="created")
+            pending = []
+
+    summary: dict[str, int] = {}
+    for item in report:
+        summary[item["status"]] = summary.get(item["status"], 0) + 1
+    return {"summary": summary, "results": report}
@@ -0,0 +1,104 @@
+import logging
+import time
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.core import settings
+from app.core.metrics import RequestScope, current_request, route_template
+
+logger = logging.getLogger(__name__)
+
+
+class StatementBudgetExceeded(RuntimeError):
+    """
+    Raised from the engine hooks in strict mode when a request runs more
+    statements than its budget or repeats one statement too often (N+1).
+    """
+
+
+class StatementBudget:
+    """
+    Route dependency that overrides `DB_STATEMENT_BUDGET` /
+    `DB_REPEATED_STATEMENT_LIMIT` for one route, `None` disables a check.
+
+    **Usage**
+
+    `@router.get("/", dependencies=[Depends(StatementBudget(2))])`
+    """
+
+    def __init__(
+        self,
+        statements: Optional[int],
+        *,
+        repeats: Optional[int] = settings.DB_REPEATED_STATEMENT_LIMIT,
+    ):
+        self.limits = (statements, repeats)
+
+    # NOTE: async so FastAPI calls it inline instead of in the threadpool
+    async def __call__(self) -> None:
+        request = current_request.get()
+        if request is not None:
+            request.limits = self.limits
+
+
+def _route(request: Optional[RequestScope]) -> str:
+    return route_template(request.scope) if request is not None else "-"
+
+
+def _violation(request: RequestScope, message: str) -> None:
+    if settings.DB_DIAGNOSTICS_STRICT:
+        raise StatementBudgetExceeded(message)
+    logger.warning(message)
+
+
+def _check(request: RequestScope, statement: str) -> None:
+    budget, repeats = request.limits or (
+        settings.DB_STATEMENT_BUDGET,
+        settings.DB_REPEATED_STATEMENT_LIMIT,
+    )
+
+    # NOTE: runs before the statement, `statements` counts the finished ones;
+    # every limit reports once per request, on the statement that crosses it
+    if budget is not None and request.statements == budget:
+        _violation(
+            request,
+            f"{request.scope['method']} {_route(request)} exceeded its budget of "
+            f"{budget} statements, next: {statement[:200]}",
+        )
+
+    if repeats is not None:
+        if request.shapes is None:
+            request.shapes = {}
+        count = request.shapes.get(statement, 0) + 1
+        request.shapes[statement] = count
+        if count == repeats:
+            _violation(
+                request,
+                f"{request.scope['method']} {_route(request)} ran the same statement "
+                f"{count} times (N+1?): {statement[:200]}",
+            )
+
+
+def install_diagnostics(engine: AsyncEngine) -> None:
+    """
+    Slow query log and per-request statement budget / N+1 detection on the
+    engine events, see the `DB_SLOW_QUERY_MS` & `DB_*` settings.
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._diagnostics_start = time.perf_counter()
+        request = current_request.get()
+        if request is not None:
+            _check(request, statement)
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context._diagnostics_start) * 1000
+        if elapsed_ms >= settings.DB_SLOW_QUERY_MS:
+            logger.warning(
+                "slow query %.1f ms on %s: %s",
+                elapsed_ms,
+                _route(current_request.get()),
+                statement[:1000],
+            )
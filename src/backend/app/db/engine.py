@@ -1,10 +1,34 @@
+import asyncio
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.core import settings
+from app.core.metrics import track_statements
+from app.db.diagnostics import install_diagnostics
+from app.db.pool import InstrumentedQueuePool
 
-engine = create_async_engine(url=f"{settings.SQLALCHEMY_DATABASE_URI}")
+engine = create_async_engine(
+    url=f"{settings.SQLALCHEMY_DATABASE_URI}",
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+track_statements(engine)
+install_diagnostics(engine)
 SessionLocal = async_sessionmaker(bind=engine)
 
 
 class Base(DeclarativeBase):
     ...
+
+
+# NOTE: open connections up-front so the first requests don't pay the connect cost
+async def warm_up_pool(size: int = 1) -> None:
+    async def _ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(_ping() for _ in range(size)))
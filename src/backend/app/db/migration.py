@@ -0,0 +1,41 @@
+from pathlib import Path
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+
+
+def get_alembic_config() -> Config:
+    config = Config(str(BASE_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BASE_DIR / "migrations"))
+    return config
+
+
+def get_head_revisions() -> set[str]:
+    script = ScriptDirectory.from_config(get_alembic_config())
+    return set(script.get_heads())
+
+
+def _get_current_revisions(conn: Connection) -> set[str]:
+    context = MigrationContext.configure(conn)
+    return set(context.get_current_heads())
+
+
+async def verify_schema(engine: AsyncEngine) -> None:
+    """
+    Compare the revision stamped in `alembic_version` with the head(s) in
+    `migrations/versions`. Run once at startup, never per request.
+    """
+    heads = get_head_revisions()
+    async with engine.connect() as conn:
+        current = await conn.run_sync(_get_current_revisions)
+
+    if current != heads:
+        raise RuntimeError(
+            f"Database schema is at revision {sorted(current) or None}, "
+            f"expected {sorted(heads)}. Run `alembic upgrade head` first."
+        )
@@ -0,0 +1,90 @@
+import time
+from bisect import bisect_left
+from typing import Any
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+# upper bounds (ms) of the checkout wait time histogram
+WAIT_BUCKETS_MS: tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolStats:
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.checkouts: int = 0
+        self.timeouts: int = 0
+        self.wait_sum_ms: float = 0.0
+        self.wait_max_ms: float = 0.0
+        self.wait_buckets: list[int] = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def observe_wait(self, wait_ms: float, *, timed_out: bool = False) -> None:
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_sum_ms += wait_ms
+        self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+        self.wait_buckets[bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+
+    def histogram(self) -> dict[str, int]:
+        labels = [f"le_{bound:g}ms" for bound in WAIT_BUCKETS_MS] + ["le_inf"]
+        # cumulative, prometheus style
+        result: dict[str, int] = {}
+        total = 0
+        for label, count in zip(labels, self.wait_buckets):
+            total += count
+            result[label] = total
+        return result
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    `AsyncAdaptedQueuePool` that records how long each checkout waited for a
+    free connection (including time spent opening a new one).
+    """
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            pool_stats.observe_wait(
+                (time.perf_counter() - start) * 1000, timed_out=True
+            )
+            raise
+        pool_stats.observe_wait((time.perf_counter() - start) * 1000)
+        return conn
+
+
+def get_pool_status(engine: AsyncEngine) -> dict[str, Any]:
+    pool = engine.pool
+    data: dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        data.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+            }
+        )
+    data.update(
+        {
+            "checkouts": pool_stats.checkouts,
+            "timeouts": pool_stats.timeouts,
+            "wait_avg_ms": round(
+                pool_stats.wait_sum_ms / max(pool_stats.checkouts, 1), 3
+            ),
+            "wait_max_ms": round(pool_stats.wait_max_ms, 3),
+            "wait_histogram": pool_stats.histogram(),
+        }
+    )
+    return data
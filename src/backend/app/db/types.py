@@ -0,0 +1,25 @@
+from typing import Any, Optional
+from uuid import UUID
+from sqlalchemy import BINARY
+from sqlalchemy.types import TypeDecorator
+
+
+class BinaryUUID(TypeDecorator):
+    """
+    UUID stored as `BINARY(16)`, accepts `UUID` or `str` and returns `UUID`.
+    """
+
+    impl = BINARY(16)
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        if not isinstance(value, UUID):
+            value = UUID(str(value))
+        return value.bytes
+
+    def process_result_value(self, value: Any, dialect) -> Optional[UUID]:
+        if value is None:
+            return None
+        return UUID(bytes=bytes(value))
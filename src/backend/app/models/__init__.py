@@ -1,2 +1,3 @@
 from .user_model import *
 from .datum_model import KelasModel
+from .absensi_model import AbsensiModel
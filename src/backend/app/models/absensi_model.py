@@ -0,0 +1,28 @@
+from datetime import date, datetime
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, Integer
+from sqlalchemy.orm import relationship, Mapped
+from app.db.engine import Base
+
+
+class AbsensiModel(Base):
+    __tablename__ = "tb_absensi"
+    __table_args__ = (
+        # NOTE: one row per siswa per day, repeat scans are ignored on insert
+        Index("ix_tb_absensi_user_id_tanggal", "user_id", "tanggal", unique=True),
+        # NOTE: daily roster -> user ids, also reloads the dedupe set on restart
+        Index("ix_tb_absensi_tanggal_user_id", "tanggal", "user_id"),
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(
+        Integer,
+        ForeignKey("tb_users.id", ondelete="CASCADE", onupdate="CASCADE"),
+        nullable=False,
+    )
+    tanggal = Column(Date, nullable=False)
+    jam_masuk = Column(DateTime, nullable=False)
+    user: Mapped["UserModel"] = relationship("UserModel", lazy="raise_on_sql")
+
+    def __init__(self, *, user_id: int, tanggal: date, jam_masuk: datetime):
+        self.user_id = user_id
+        self.tanggal = tanggal
+        self.jam_masuk = jam_masuk
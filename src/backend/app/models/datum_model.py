@@ -7,7 +7,9 @@ class KelasModel(Base):
     __tablename__ = "tb_datum_kelas"
     id = Column(Integer, primary_key=True)
     kelas = Column(String(16), nullable=False, unique=True)
-    siswa = relationship("UserDetailSiswa", back_populates="kelas")
+    siswa = relationship(
+        "UserDetailSiswa", back_populates="kelas", lazy="raise_on_sql"
+    )
 
     def __init__(self, *, kelas: str) -> str:
         self.kelas = kelas
@@ -2,18 +2,22 @@ from datetime import date, datetime, timedelta
 from typing import Optional
 from uuid import uuid4
 from sqlalchemy import (
+    BINARY,
     Boolean,
     Column,
     Date,
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     func,
+    literal_column,
 )
 from sqlalchemy.orm import relationship, Mapped
 from app.db.engine import Base
+from app.db.types import BinaryUUID
 from app.core import settings
 from app.models.datum_model import KelasModel
 from app.schemas.base_schema import EnumRole
@@ -42,8 +46,12 @@ class AgamaEnum(str, enum.Enum):
 
 class UserModel(Base):
     __tablename__ = "tb_users"
+    __table_args__ = (
+        # NOTE: listing filtered by role/status, paginated by id
+        Index("ix_tb_users_role_is_active_id", "role", "is_active", "id"),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
-    uuid = Column(String(36), nullable=False, default=uuid4)
+    uuid = Column(BinaryUUID, nullable=False, default=uuid4, unique=True, index=True)
     username = Column(String(32), nullable=False, unique=True)
     hashed_password = Column(String(512), nullable=False)
     full_name = Column(String(64), nullable=False)
@@ -53,17 +61,46 @@ class UserModel(Base):
     updated_at = Column(
         DateTime, nullable=False, default=func.now(), onupdate=func.now()
     )
+    # NOTE: bumped by every UPDATE of the row, the ETag of the user resources;
+    # `updated_at` has second precision
+    version = Column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version + 1"),
+    )
+    # NOTE: nothing is loaded implicitly, every query picks its own loader
+    # options (see app.db.crud.user_crud.user_detail_options)
     login: Mapped["UserLoginModel"] = relationship(
-        "UserLoginModel", back_populates="user", lazy="selectin"
+        "UserLoginModel",
+        back_populates="user",
+        lazy="raise_on_sql",
+        passive_deletes=True,
+    )
+    sessions: Mapped[list["UserSessionModel"]] = relationship(
+        "UserSessionModel",
+        back_populates="user",
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
     admin: Mapped["UserDetailAdmin"] = relationship(
-        "UserDetailAdmin", backref="user", lazy="selectin"
+        "UserDetailAdmin",
+        back_populates="user",
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
     guru: Mapped["UserDetailGuru"] = relationship(
-        "UserDetailGuru", back_populates="user", lazy="selectin"
+        "UserDetailGuru",
+        back_populates="user",
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
     siswa: Mapped["UserDetailSiswa"] = relationship(
-        "UserDetailSiswa", back_populates="user", lazy="selectin"
+        "UserDetailSiswa",
+        back_populates="user",
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
 
     def __init__(
@@ -73,9 +110,9 @@ class UserModel(Base):
         full_name: str,
         role: EnumRole,
         is_active: Boolean = True,
-        admin: Optional["UserDetailAdmin"] = [],
-        guru: Optional["UserDetailGuru"] = [],
-        siswa: Optional["UserDetailSiswa"] = [],
+        admin: Optional["UserDetailAdmin"] = None,
+        guru: Optional["UserDetailGuru"] = None,
+        siswa: Optional["UserDetailSiswa"] = None,
     ):
         self.username = username
         self.hashed_password = hashedPassword
@@ -94,8 +131,11 @@ class UserModel(Base):
 
 class UserLoginModel(Base):
     __tablename__ = "tb_user_login"
+    __table_args__ = (
+        # NOTE: one row per user, target of the login upsert
+        Index("ix_tb_user_login_user_id", "user_id", unique=True),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
-    refreh_token = Column(String(512), nullable=True)
     user_id = Column(
         Integer, ForeignKey("tb_users.id", ondelete="CASCADE", onupdate="CASCADE")
     )
@@ -103,11 +143,10 @@ class UserLoginModel(Base):
     counter_login = Column(Integer, nullable=False, default=0)
     last_login_at = Column(DateTime, default=func.now(), onupdate=func.now())
     user: Mapped["UserModel"] = relationship(
-        "UserModel", back_populates="login", lazy="selectin"
+        "UserModel", back_populates="login", lazy="raise_on_sql"
     )
 
-    def __init__(self, *, refrehToken, userID, expireDelta: timedelta | None = None):
-        self.refreh_token = refrehToken
+    def __init__(self, *, userID, expireDelta: timedelta | None = None):
         self.user_id = userID
         self.counter_login: int = +1
         if expireDelta:
@@ -118,6 +157,29 @@ class UserLoginModel(Base):
             )
 
 
+# NOTE: one row per login (refresh token family), every refresh token of the
+# family carries `session_id` as its `sid` claim, only the newest is stored
+class UserSessionModel(Base):
+    __tablename__ = "tb_user_session"
+    __table_args__ = (
+        # NOTE: expired sessions of a user are pruned at login
+        Index("ix_tb_user_session_user_id_expire_token", "user_id", "expire_token"),
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    session_id = Column(String(32), nullable=False, unique=True)
+    refresh_token_hash = Column(BINARY(32), nullable=False)
+    user_id = Column(
+        Integer,
+        ForeignKey("tb_users.id", ondelete="CASCADE", onupdate="CASCADE"),
+        nullable=False,
+    )
+    expire_token = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=func.now())
+    user: Mapped["UserModel"] = relationship(
+        "UserModel", back_populates="sessions", lazy="raise_on_sql"
+    )
+
+
 class UserDetailAdmin(Base):
     __tablename__ = "tb_detail_admin"
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -129,7 +191,7 @@ class UserDetailAdmin(Base):
         Integer, ForeignKey("tb_users.id", ondelete="CASCADE", onupdate="CASCADE")
     )
     user: Mapped["UserModel"] = relationship(
-        "UserModel", back_populates="admin", lazy="selectin"
+        "UserModel", back_populates="admin", lazy="raise_on_sql"
     )
 
     def __init__(
@@ -157,7 +219,7 @@ class UserDetailGuru(Base):
         Integer, ForeignKey("tb_users.id", ondelete="CASCADE", onupdate="CASCADE")
     )
     user: Mapped["UserModel"] = relationship(
-        "UserModel", back_populates="guru", lazy="selectin"
+        "UserModel", back_populates="guru", lazy="raise_on_sql"
     )
 
     def __init__(
@@ -176,6 +238,10 @@ class UserDetailGuru(Base):
 
 class UserDetailSiswa(Base):
     __tablename__ = "tb_detail_siswa"
+    __table_args__ = (
+        # NOTE: class roster -> user ids without touching the detail rows
+        Index("ix_tb_detail_siswa_kelas_id_user_id", "kelas_id", "user_id"),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     gender = Column(Enum(GenderEnum), nullable=False)
     tempat_lahir = Column(String(64), nullable=True)
@@ -196,10 +262,10 @@ class UserDetailSiswa(Base):
         Integer, ForeignKey("tb_users.id", ondelete="CASCADE", onupdate="CASCADE")
     )
     kelas: Mapped["KelasModel"] = relationship(
-        "KelasModel", back_populates="siswa", lazy="selectin"
+        "KelasModel", back_populates="siswa", lazy="raise_on_sql"
     )
     user: Mapped["UserModel"] = relationship(
-        "UserModel", back_populates="siswa", lazy="selectin"
+        "UserModel", back_populates="siswa", lazy="raise_on_sql"
     )
 
     def __init__(
@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+
+class ScanSchema(BaseModel):
+    # content of the QR code, the uuid of the siswa
+    qr: str
+    # time on the scanner, `None` -> time the server received it
+    scanned_at: Optional[datetime] = None
+
+
+class ScanItemResultSchema(BaseModel):
+    # position of the scan in the request
+    index: int
+    qr: str
+    # accepted | duplicate | rejected
+    status: str
+    # why a scan was rejected
+    detail: Optional[str] = None
+
+
+class ScanResultSchema(BaseModel):
+    accepted: int
+    duplicates: int
+    rejected: list[str]
+    results: list[ScanItemResultSchema]
@@ -9,6 +9,10 @@ class TokenShema(BaseModel):
     token_type: str
 
 
+class RefreshTokenSchema(BaseModel):
+    refresh_token: str
+
+
 class TokenPayloadSchema(BaseModel):
     # identity: dict[str, Any] | str | None = None
     username: str | None = None
@@ -51,6 +51,27 @@ class UserOutSchm(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserPrincipalSchema(BaseModel):
+    """
+    Immutable snapshot of the authenticated user, safe to cache between requests.
+    """
+
+    id: int
+    uuid: str
+    username: str
+    full_name: str
+    role: EnumRole
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+    version: int
+    admin: Optional[AdminOutSchema] = None
+    guru: Optional[GuruOutSchema] = None
+    siswa: Optional[SiswaOutSchema] = None
+
+    model_config = ConfigDict(frozen=True)
+
+
 class UserSchema(UserBase):
     id: int
     admin: list[Any] = []
@@ -0,0 +1,78 @@
+from datetime import datetime
+from enum import Enum
+from functools import lru_cache
+from typing import Any
+from app.core.config import date_to_str, datetime_to_str
+from app.core.responses import http_date, make_etag
+from app.models.user_model import UserModel
+
+# NOTE: bulk created users share timestamps, so the strings repeat a lot
+cached_date_str = lru_cache(maxsize=4096)(date_to_str)
+cached_datetime_str = lru_cache(maxsize=4096)(datetime_to_str)
+
+
+def _value(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+def user_out(user: UserModel) -> dict[str, Any]:
+    """
+    ORM user -> plain dict with the exact shape `UserOutSchm` dumps to
+    (`exclude_unset`, `user_id` alias), without running its validators.
+    The role's detail relationship must already be loaded.
+    """
+    role = _value(user.role)
+    data: dict[str, Any] = {
+        "user_id": str(user.uuid),
+        "username": user.username,
+        "full_name": user.full_name.title(),
+        "role": role,
+        "is_active": user.is_active,
+        "created_at": cached_date_str(user.created_at),
+        "updated_at": cached_datetime_str(user.updated_at),
+    }
+
+    if role == "admin" and user.admin:
+        data["admin"] = {
+            "gender": _value(user.admin.gender),
+            "agama": _value(user.admin.agama),
+            "alamat": user.admin.alamat,
+            "telp": user.admin.telp,
+        }
+    if role == "guru" and user.guru:
+        data["guru"] = {
+            "gender": _value(user.guru.gender),
+            "agama": _value(user.guru.agama),
+            "alamat": user.guru.alamat,
+            "telp": user.guru.telp,
+        }
+    if role == "siswa" and user.siswa:
+        siswa = user.siswa
+        data["siswa"] = {
+            "gender": _value(siswa.gender),
+            "tempat_lahir": siswa.tempat_lahir,
+            "tgl_lahir": siswa.tgl_lahir.isoformat() if siswa.tgl_lahir else None,
+            "agama": _value(siswa.agama),
+            "nama_ortu": siswa.nama_ortu,
+            "alamat": siswa.alamat,
+            "telp": siswa.telp,
+            "qr_name": siswa.qr_name,
+            "photo_name": siswa.photo_name,
+            "idcard_name": siswa.idcard_name,
+            "kelas_id": siswa.kelas_id,
+            "kelas": siswa.kelas.kelas if siswa.kelas_id and siswa.kelas else None,
+        }
+    return data
+
+
+def user_validators(user_id: Any, version: int, updated_at: datetime) -> dict[str, str]:
+    """
+    ETag / Last-Modified of a user representation, both from the `tb_users`
+    row alone so a revalidation skips the detail join. The ETag follows
+    `version`, `updated_at` only has second precision.
+    """
+    return {
+        "ETag": make_etag(f"{user_id}:{version}".encode()),
+        "Last-Modified": http_date(updated_at),
+        "Cache-Control": "private, no-cache",
+    }
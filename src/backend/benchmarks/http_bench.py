@@ -0,0 +1,277 @@
+"""
+HTTP benchmark for the hot endpoints, the app runs in-process (no server, no
+network) against a throwaway SQLite database or any SQLAlchemy URL given with
+`--database-url`.
+
+    python -m benchmarks.http_bench --concurrency 16 --requests 500 \\
+        --output bench.json
+
+The JSON report (throughput, p50/p95/p99 per scenario plus the run settings
+and git commit) is meant to be diffed between commits. Any non-2xx response
+fails the run (exit status 1) and no report is written.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PASSWORD = "benchmark"
+SCAN_BATCH = 20
+SCENARIOS = ["login", "me", "users", "user", "kelas", "scan"]
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--database-url",
+        help="SQLAlchemy async URL, default is a temporary sqlite+aiosqlite file",
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--requests", type=int, default=300, help="requests per scenario"
+    )
+    parser.add_argument(
+        "--login-requests",
+        type=int,
+        default=40,
+        help="requests for the login scenario, bound by password hashing",
+    )
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--siswa", type=int, default=2000)
+    parser.add_argument("--guru", type=int, default=80)
+    parser.add_argument(
+        "--rombel", type=int, default=6, help="kelas per tingkat and jurusan"
+    )
+    parser.add_argument(
+        "--scenario", action="append", choices=SCENARIOS, help="default is all"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench.json")
+    return parser.parse_args(argv)
+
+
+def configure_env(database_url: str) -> None:
+    # NOTE: settings are read at import time, everything must be set before
+    # `app` is imported
+    os.environ["SQLALCHEMY_DATABASE_URI"] = database_url
+    for key, value in {
+        "SECRET_KEY": "benchmark",
+        "PROJECT_NAME": "benchmark",
+        "DB_USER": "benchmark",
+        "DB_PASSWORD": "benchmark",
+        "DB_HOST": "localhost",
+        "DB_NAME": "benchmark",
+        # one in-process client would trip the per-client login buckets
+        "LOGIN_RATE_PER_MINUTE": "1000000",
+        "LOGIN_RATE_BURST": "1000000",
+        "LOGIN_IP_RATE_PER_MINUTE": "1000000",
+        "LOGIN_IP_RATE_BURST": "1000000",
+    }.items():
+        os.environ.setdefault(key, value)
+
+
+async def seed(args: argparse.Namespace) -> dict[str, Any]:
+    from benchmarks.seed import CHUNK_SIZE, seed_database
+
+    return await seed_database(
+        argparse.Namespace(
+            siswa=args.siswa,
+            guru=args.guru,
+            admin=1,
+            rombel=args.rombel,
+            login_ratio=0.6,
+            password=PASSWORD,
+            seed=args.seed,
+            chunk_size=CHUNK_SIZE,
+            reset=True,
+        )
+    )
+
+
+def summarize(latencies: list[float], elapsed: float, statuses: dict[int, int]):
+    ms = sorted(x * 1000 for x in latencies)
+    cuts = statistics.quantiles(ms, n=100, method="inclusive")
+    ok = sum(count for status, count in statuses.items() if 200 <= status < 300)
+    return {
+        "requests": len(ms),
+        "errors": len(ms) - ok,
+        "status": {str(k): v for k, v in sorted(statuses.items())},
+        "throughput_rps": round(len(ms) / elapsed, 2),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(cuts[49], 3),
+        "p95_ms": round(cuts[94], 3),
+        "p99_ms": round(cuts[98], 3),
+        "max_ms": round(ms[-1], 3),
+    }
+
+
+async def drive(
+    send: Callable[[int], Awaitable[Any]], *, total: int, concurrency: int
+) -> tuple[list[float], float, dict[int, int]]:
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            response = await send(i)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start, statuses
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    import httpx
+    from app import app
+    from app.core import settings
+
+    seeded = await seed(args)
+    rng = random.Random(args.seed)
+    api = settings.API_V1_STR
+    siswa = seeded["siswa"]
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+
+            async def token(username: str) -> dict[str, str]:
+                response = await client.post(
+                    f"{api}/auth/login",
+                    data={"username": username, "password": PASSWORD},
+                )
+                response.raise_for_status()
+                return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            admin = await token(seeded["admin"][0])
+            student = await token(siswa[0][0])
+
+            scenarios: dict[str, tuple[Callable[[int], Awaitable[Any]], int]] = {
+                "login": (
+                    lambda i: client.post(
+                        f"{api}/auth/login",
+                        data={
+                            "username": siswa[i % len(siswa)][0],
+                            "password": PASSWORD,
+                        },
+                    ),
+                    args.login_requests,
+                ),
+                "me": (
+                    lambda i: client.get(f"{api}/auth/me", headers=student),
+                    args.requests,
+                ),
+                "users": (
+                    lambda i: client.get(
+                        f"{api}/users/",
+                        params={"limit": 50, "role": "siswa"},
+                        headers=admin,
+                    ),
+                    args.requests,
+                ),
+                "user": (
+                    lambda i: client.get(
+                        f"{api}/users/{rng.choice(siswa)[1]}", headers=admin
+                    ),
+                    args.requests,
+                ),
+                "kelas": (
+                    lambda i: client.get(f"{api}/data-umum/kelas"),
+                    args.requests,
+                ),
+                # NOTE: gate scanner uploads, SCAN_BATCH siswa per request
+                "scan": (
+                    lambda i: client.post(
+                        f"{api}/absensi/scan",
+                        json=[
+                            {"qr": str(siswa[(i * SCAN_BATCH + j) % len(siswa)][1])}
+                            for j in range(SCAN_BATCH)
+                        ],
+                        headers=admin,
+                    ),
+                    args.requests,
+                ),
+            }
+
+            results = {}
+            for name in args.scenario or SCENARIOS:
+                send, total = scenarios[name]
+                await drive(
+                    send, total=min(args.warmup, total), concurrency=args.concurrency
+                )
+                latencies, elapsed, statuses = await drive(
+                    send, total=total, concurrency=args.concurrency
+                )
+                results[name] = summarize(latencies, elapsed, statuses)
+                print(
+                    f"{name:>6}: {results[name]['throughput_rps']:>9} req/s  "
+                    f"p50 {results[name]['p50_ms']:>8} ms  "
+                    f"p95 {results[name]['p95_ms']:>8} ms  "
+                    f"p99 {results[name]['p99_ms']:>8} ms  "
+                    f"errors {results[name]['errors']}",
+                    file=sys.stderr,
+                )
+
+    return {"seeded": seeded["counts"], "results": results}
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite+aiosqlite:///{tmp}/bench.db"
+        configure_env(database_url)
+        sys.path.insert(0, str(BASE_DIR))
+        report = asyncio.run(run(args))
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "database": database_url.split(":", 1)[0],
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "login_requests": args.login_requests,
+        **report,
+    }
+    # NOTE: latencies of failed requests measure the error path, not the
+    # endpoint, such a run is not published
+    failed = [name for name, result in report["results"].items() if result["errors"]]
+    if failed:
+        sys.exit(f"non-2xx responses in {', '.join(failed)}, no report written")
+
+    Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    print(f"report written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
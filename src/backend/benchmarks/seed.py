@@ -0,0 +1,471 @@
+"""
+Synthetic school data for load testing: kelas, admin / guru / siswa users with
+their detail rows and login bookkeeping. Output is deterministic for a given
+`--seed`, everything is bulk loaded with chunked executemany and one
+precomputed password hash.
+
+    python -m benchmarks.seed --siswa 96000 --guru 4000 --reset
+
+Targets the configured database (`.env`), or `--database-url`.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Iterator
+from uuid import UUID
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+CHUNK_SIZE = 5000
+
+NAMA_DEPAN_LAKI = [
+    "Ahmad",
+    "Andi",
+    "Arif",
+    "Bayu",
+    "Budi",
+    "Dimas",
+    "Eko",
+    "Fajar",
+    "Farhan",
+    "Hadi",
+    "Ilham",
+    "Irfan",
+    "Joko",
+    "Kurniawan",
+    "Muhammad",
+    "Rizky",
+    "Reza",
+    "Rudi",
+    "Syahrul",
+    "Taufik",
+    "Wahyu",
+    "Yusuf",
+    "Zainal",
+    "Agus",
+    "Hendra",
+]
+NAMA_DEPAN_PEREMPUAN = [
+    "Aisyah",
+    "Ayu",
+    "Citra",
+    "Dewi",
+    "Dian",
+    "Eka",
+    "Fitri",
+    "Indah",
+    "Intan",
+    "Kartika",
+    "Lestari",
+    "Maya",
+    "Nabila",
+    "Nur",
+    "Putri",
+    "Rahma",
+    "Rina",
+    "Sari",
+    "Siti",
+    "Tri",
+    "Wulan",
+    "Yuni",
+    "Zahra",
+    "Annisa",
+    "Nurul",
+]
+NAMA_BELAKANG = [
+    "Pratama",
+    "Saputra",
+    "Wijaya",
+    "Hidayat",
+    "Kurniawan",
+    "Setiawan",
+    "Rahmawati",
+    "Nugroho",
+    "Siregar",
+    "Hasibuan",
+    "Nasution",
+    "Lubis",
+    "Syahputra",
+    "Ramadhan",
+    "Permata",
+    "Maulana",
+    "Sari",
+    "Wahyuni",
+    "Firmansyah",
+    "Hakim",
+    "Daeng",
+    "Rusdi",
+    "Amir",
+    "Anwar",
+    "Halim",
+]
+KOTA = [
+    "Makassar",
+    "Gowa",
+    "Maros",
+    "Takalar",
+    "Bone",
+    "Parepare",
+    "Palopo",
+    "Bulukumba",
+    "Sinjai",
+    "Jeneponto",
+    "Bantaeng",
+    "Pangkep",
+    "Barru",
+    "Soppeng",
+    "Wajo",
+    "Sidrap",
+    "Pinrang",
+    "Enrekang",
+    "Luwu",
+    "Selayar",
+]
+JALAN = [
+    "Perintis Kemerdekaan",
+    "Urip Sumoharjo",
+    "Sultan Alauddin",
+    "AP Pettarani",
+    "Veteran",
+    "Sudirman",
+    "Ahmad Yani",
+    "Gunung Bawakaraeng",
+    "Hertasning",
+    "Abdullah Daeng Sirua",
+    "Tamalate",
+    "Andi Tonro",
+    "Poros Malino",
+]
+# roughly the national distribution
+AGAMA_WEIGHTS = {
+    "islam": 87.0,
+    "kristen": 7.4,
+    "katolik": 3.1,
+    "hindu": 1.7,
+    "budha": 0.7,
+    "konghucu": 0.1,
+}
+TINGKAT = ["X", "XI", "XII"]
+JURUSAN = ["IPA", "IPS"]
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", help="overrides SQLALCHEMY_DATABASE_URI")
+    parser.add_argument("--siswa", type=int, default=20000)
+    parser.add_argument("--guru", type=int, default=800)
+    parser.add_argument("--admin", type=int, default=3)
+    parser.add_argument(
+        "--rombel", type=int, default=12, help="kelas per tingkat and jurusan"
+    )
+    parser.add_argument(
+        "--login-ratio",
+        type=float,
+        default=0.6,
+        help="share of users with a tb_user_login row",
+    )
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="drop & recreate every table first (stamped at the alembic heads)",
+    )
+    return parser.parse_args(argv)
+
+
+def nama_lengkap(rng: random.Random, gender: str) -> str:
+    depan = NAMA_DEPAN_LAKI if gender == "laki-laki" else NAMA_DEPAN_PEREMPUAN
+    if rng.random() < 0.4:
+        return f"{rng.choice(depan)} {rng.choice(depan)} {rng.choice(NAMA_BELAKANG)}"
+    return f"{rng.choice(depan)} {rng.choice(NAMA_BELAKANG)}"
+
+
+def alamat(rng: random.Random) -> str:
+    return f"Jl. {rng.choice(JALAN)} No. {rng.randint(1, 250)}, {rng.choice(KOTA)}"
+
+
+def telp(rng: random.Random) -> str:
+    return f"08{rng.randint(11, 59)}{rng.randint(0, 99_999_999):08d}"
+
+
+def tanggal(rng: random.Random, start_year: int, end_year: int) -> date:
+    start = date(start_year, 1, 1)
+    return start + timedelta(days=rng.randrange((date(end_year, 12, 31) - start).days))
+
+
+def nisn(seq: int, tgl_lahir: date) -> str:
+    # NISN: 3 digits of the birth year + 7 digit sequence
+    return f"{tgl_lahir.year % 1000:03d}{seq % 10_000_000:07d}"
+
+
+def nip(rng: random.Random, seq: int, gender: str, tgl_lahir: date) -> str:
+    # NIP: birth date, appointment month, gender digit, sequence
+    tmt = tanggal(rng, max(tgl_lahir.year + 22, 2000), 2023)
+    return (
+        f"{tgl_lahir:%Y%m%d}{tmt:%Y%m}"
+        f"{1 if gender == 'laki-laki' else 2}{seq % 1000:03d}"
+    )
+
+
+def _uuid(rng: random.Random) -> UUID:
+    return UUID(int=rng.getrandbits(128), version=4)
+
+
+def generate_chunk(
+    rng: random.Random,
+    *,
+    roles: list[str],
+    first_id: int,
+    hashed_password: str,
+    kelas_ids: list[int],
+    login_ratio: float,
+    now: datetime,
+    nips: set[str],
+) -> dict[str, list[dict[str, Any]]]:
+    """
+    Rows for users `first_id .. first_id + len(roles) - 1`, primary keys are
+    assigned up-front so detail & login rows need no id round trip.
+    """
+    agama, agama_weights = zip(*AGAMA_WEIGHTS.items())
+    rows: dict[str, list[dict[str, Any]]] = {
+        "users": [],
+        "admin": [],
+        "guru": [],
+        "siswa": [],
+        "login": [],
+        "session": [],
+    }
+
+    for user_id, role in enumerate(roles, start=first_id):
+        gender = rng.choice(["laki-laki", "perempuan"])
+        if role == "siswa":
+            tgl_lahir = tanggal(rng, 2006, 2009)
+            username = nisn(user_id, tgl_lahir)
+        elif role == "guru":
+            tgl_lahir = tanggal(rng, 1965, 1998)
+            username = nip(rng, user_id, gender, tgl_lahir)
+            # two guru may share birth date, appointment & sequence digits
+            while username in nips:
+                username = nip(rng, user_id, gender, tgl_lahir)
+            nips.add(username)
+        else:
+            tgl_lahir = None
+            username = f"admin{user_id}"
+
+        created_at = now - timedelta(days=rng.randint(0, 3 * 365))
+        rows["users"].append(
+            {
+                "id": user_id,
+                "uuid": _uuid(rng),
+                "username": username,
+                "hashed_password": hashed_password,
+                "full_name": nama_lengkap(rng, gender),
+                "role": role,
+                # NOTE: admins stay active, the benchmarks log in with them
+                "is_active": rng.random() > 0.02 or role == "admin",
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+        )
+
+        detail = {
+            "user_id": user_id,
+            "gender": gender,
+            "agama": rng.choices(agama, agama_weights)[0],
+            "alamat": alamat(rng),
+            "telp": telp(rng),
+        }
+        if role == "siswa":
+            detail.update(
+                tempat_lahir=rng.choice(KOTA),
+                tgl_lahir=tgl_lahir,
+                nama_ortu=nama_lengkap(rng, "laki-laki"),
+                kelas_id=rng.choice(kelas_ids),
+            )
+        rows[role].append(detail)
+
+        if rng.random() < login_ratio:
+            last_login_at = now - timedelta(minutes=rng.randint(0, 30 * 24 * 60))
+            rows["login"].append(
+                {
+                    "user_id": user_id,
+                    "expire_token": last_login_at + timedelta(days=7),
+                    "counter_login": rng.randint(1, 300),
+                    "last_login_at": last_login_at,
+                }
+            )
+            rows["session"].append(
+                {
+                    "session_id": f"seed-{user_id}",
+                    # random digest, matches no real refresh token
+                    "refresh_token_hash": rng.randbytes(32),
+                    "user_id": user_id,
+                    "expire_token": last_login_at + timedelta(days=7),
+                    "created_at": last_login_at,
+                }
+            )
+    return rows
+
+
+def _roles(args: argparse.Namespace) -> list[str]:
+    return ["admin"] * args.admin + ["guru"] * args.guru + ["siswa"] * args.siswa
+
+
+def _chunks(items: list, size: int) -> Iterator[list]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+async def seed_database(args: argparse.Namespace) -> dict[str, Any]:
+    """
+    Load the synthetic data set described by `args` and return the row counts,
+    the admin & guru usernames and `(username, uuid)` of the seeded siswa, only
+    active users are listed (inactive ones can't log in).
+    """
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+    from sqlalchemy import func, insert, select
+    from werkzeug.security import generate_password_hash
+    from app.db.engine import Base, engine
+    from app.db.migration import get_alembic_config
+    from app.models.datum_model import KelasModel
+    from app.models.user_model import (
+        GenderEnum,
+        RoleEnum,
+        UserDetailAdmin,
+        UserDetailGuru,
+        UserDetailSiswa,
+        UserLoginModel,
+        UserModel,
+        UserSessionModel,
+    )
+
+    def _stamp(conn) -> None:
+        script = ScriptDirectory.from_config(get_alembic_config())
+        MigrationContext.configure(conn).stamp(script, "heads")
+
+    # NOTE: one hash for every user, seeding must not pay the hashing cost per row
+    hashed_password = generate_password_hash(args.password)
+    now = datetime.now().replace(microsecond=0)
+    role_values = {
+        "admin": RoleEnum.admin,
+        "guru": RoleEnum.guru,
+        "siswa": RoleEnum.siwsa,
+    }
+    detail_models = {
+        "admin": UserDetailAdmin,
+        "guru": UserDetailGuru,
+        "siswa": UserDetailSiswa,
+    }
+
+    async with engine.begin() as conn:
+        if args.reset:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(_stamp)
+
+        names = [
+            f"{tingkat} {jurusan} {rombel}"
+            for tingkat in TINGKAT
+            for jurusan in JURUSAN
+            for rombel in range(1, args.rombel + 1)
+        ]
+        existing = set((await conn.execute(select(KelasModel.kelas))).scalars())
+        missing = [{"kelas": name} for name in names if name not in existing]
+        if missing:
+            await conn.execute(insert(KelasModel), missing)
+        kelas_ids = (
+            (
+                await conn.execute(
+                    select(KelasModel.id).filter(KelasModel.kelas.in_(names))
+                )
+            )
+            .scalars()
+            .all()
+        )
+        first_id = (await conn.scalar(select(func.max(UserModel.id)))) or 0
+
+    # appending to existing rows must not replay the same uuids / tokens
+    rng = random.Random(f"{args.seed}:{first_id}")
+
+    counts = {"kelas": len(missing), "users": 0, "login": 0}
+    admin: list[str] = []
+    guru: list[str] = []
+    siswa: list[tuple[str, UUID]] = []
+    nips: set[str] = set()
+    first_id += 1
+    for roles in _chunks(_roles(args), args.chunk_size):
+        rows = generate_chunk(
+            rng,
+            roles=roles,
+            first_id=first_id,
+            hashed_password=hashed_password,
+            kelas_ids=kelas_ids,
+            login_ratio=args.login_ratio,
+            now=now,
+            nips=nips,
+        )
+        first_id += len(roles)
+        for user in rows["users"]:
+            if user["is_active"]:
+                if user["role"] == "siswa":
+                    siswa.append((user["username"], user["uuid"]))
+                elif user["role"] == "guru":
+                    guru.append(user["username"])
+                else:
+                    admin.append(user["username"])
+            user["role"] = role_values[user["role"]]
+        for detail in rows["guru"] + rows["siswa"]:
+            detail["gender"] = GenderEnum(detail["gender"])
+
+        # NOTE: one transaction per chunk keeps lock time & memory bounded
+        async with engine.begin() as conn:
+            await conn.execute(insert(UserModel), rows["users"])
+            for role, model in detail_models.items():
+                if rows[role]:
+                    await conn.execute(insert(model), rows[role])
+            if rows["login"]:
+                await conn.execute(insert(UserLoginModel), rows["login"])
+                await conn.execute(insert(UserSessionModel), rows["session"])
+        counts["users"] += len(rows["users"])
+        counts["login"] += len(rows["login"])
+
+    counts.update(admin=args.admin, guru=args.guru, siswa=args.siswa)
+    return {"counts": counts, "admin": admin, "guru": guru, "siswa": siswa}
+
+
+async def _main(args: argparse.Namespace) -> None:
+    from app.db.engine import engine
+
+    start = time.perf_counter()
+    try:
+        result = await seed_database(args)
+    finally:
+        await engine.dispose()
+    elapsed = time.perf_counter() - start
+    counts = result["counts"]
+    print(
+        f"seeded {counts['users']} users ({counts['admin']} admin, "
+        f"{counts['guru']} guru, {counts['siswa']} siswa), {counts['kelas']} kelas, "
+        f"{counts['login']} logins in {elapsed:.1f}s",
+        file=sys.stderr,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    if args.database_url:
+        os.environ["SQLALCHEMY_DATABASE_URI"] = args.database_url
+    sys.path.insert(0, str(BASE_DIR))
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""store tb_users.uuid as indexed binary(16)
+
+Revision ID: 9b2e4d7c1a05
+Revises: 3f1c9a7d2b64
+Create Date: 2026-10-18 10:02:17.530114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2e4d7c1a05'
+down_revision: Union[str, None] = '3f1c9a7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# rows converted per UPDATE, every batch is committed on its own so the
+# backfill never holds a long lock on tb_users
+BATCH_SIZE = 5000
+
+
+def _backfill(sql: str) -> None:
+    bind = op.get_bind()
+    min_id, max_id = bind.execute(sa.text("SELECT MIN(id), MAX(id) FROM tb_users")).one()
+    if min_id is None:
+        return
+    with op.get_context().autocommit_block():
+        for start in range(min_id, max_id + 1, BATCH_SIZE):
+            bind.execute(
+                sa.text(sql), {"start": start, "end": start + BATCH_SIZE - 1}
+            )
+
+
+def upgrade() -> None:
+    op.add_column('tb_users', sa.Column('uuid_bin', sa.BINARY(length=16), nullable=True))
+    # old values are either 36 char dashed or 32 char hex strings
+    _backfill(
+        "UPDATE tb_users SET uuid_bin = UNHEX(REPLACE(uuid, '-', '')) "
+        "WHERE uuid_bin IS NULL AND id BETWEEN :start AND :end"
+    )
+    op.drop_column('tb_users', 'uuid')
+    op.alter_column('tb_users', 'uuid_bin', new_column_name='uuid', existing_type=sa.BINARY(length=16), nullable=False)
+    op.create_index(op.f('ix_tb_users_uuid'), 'tb_users', ['uuid'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tb_users_uuid'), table_name='tb_users')
+    op.add_column('tb_users', sa.Column('uuid_str', sa.String(length=36), nullable=True))
+    _backfill(
+        "UPDATE tb_users SET uuid_str = LOWER(CONCAT_WS('-', "
+        "SUBSTR(HEX(uuid), 1, 8), SUBSTR(HEX(uuid), 9, 4), SUBSTR(HEX(uuid), 13, 4), "
+        "SUBSTR(HEX(uuid), 17, 4), SUBSTR(HEX(uuid), 21))) "
+        "WHERE uuid_str IS NULL AND id BETWEEN :start AND :end"
+    )
+    op.drop_column('tb_users', 'uuid')
+    op.alter_column('tb_users', 'uuid_str', new_column_name='uuid', existing_type=sa.String(length=36), nullable=False)
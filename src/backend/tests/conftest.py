@@ -0,0 +1,108 @@
+"""
+The app runs in-process against a throwaway SQLite database seeded once per
+session with `benchmarks.seed`, run from `src/backend`:
+
+    python -m pytest
+"""
+
+import argparse
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import pytest
+
+from benchmarks.http_bench import PASSWORD, configure_env, seed
+
+# NOTE: settings are read when `app` is imported, everything must be set first
+TMP_DIR = tempfile.mkdtemp(prefix="backend-tests-")
+configure_env(f"sqlite+aiosqlite:///{TMP_DIR}/test.db")
+os.environ.setdefault("MEDIA_ROOT", f"{TMP_DIR}/media")
+os.environ.setdefault("DB_DIAGNOSTICS_STRICT", "1")
+
+API = "/api/v1"
+
+
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def seeded() -> dict[str, Any]:
+    return await seed(argparse.Namespace(siswa=60, guru=6, rombel=1, seed=7))
+
+
+@pytest.fixture(scope="session")
+async def client(seeded):
+    import httpx
+    from app import app
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            yield client
+
+
+async def login(client, username: str) -> dict[str, str]:
+    response = await client.post(
+        f"{API}/auth/login", data={"username": username, "password": PASSWORD}
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+async def users(client, seeded) -> dict[str, dict[str, Any]]:
+    """
+    One active user per role: `{"admin": {"headers", "uuid", "username"}, ...}`
+    """
+    result = {}
+    for role, username in (
+        ("admin", seeded["admin"][0]),
+        ("guru", seeded["guru"][0]),
+        ("siswa", seeded["siswa"][0][0]),
+    ):
+        headers = await login(client, username)
+        me = (await client.get(f"{API}/auth/me", headers=headers)).json()
+        result[role] = {"headers": headers, "uuid": me["user_id"], "username": username}
+    return result
+
+
+@pytest.fixture
+def cold_caches() -> None:
+    """
+    Drop the cached principals & verified tokens so a request pays for its
+    own lookups.
+    """
+    from app.core.dependencies import principal_cache, token_cache
+
+    principal_cache.clear()
+    token_cache.clear()
+
+
+@pytest.fixture
+def count_statements():
+    """
+    `with count_statements() as statements:` collects the SQL sent to the
+    database, counted on the engine's `before_cursor_execute`.
+    """
+    from sqlalchemy import event
+    from app.db.engine import engine
+
+    @contextmanager
+    def counter() -> Iterator[list[str]]:
+        statements: list[str] = []
+
+        def before(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", before)
+        try:
+            yield statements
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", before)
+
+    return counter
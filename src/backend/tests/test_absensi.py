@@ -0,0 +1,45 @@
+"""
+`POST /absensi/scan`: client timestamps outside the accepted window are
+rejected per scan and never buffered.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from tests.conftest import API
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_scan_window(client, users, seeded):
+    qr = [str(uuid) for _, uuid in seeded["siswa"][10:15]]
+    now = datetime.now()
+    scans = [
+        {"qr": qr[0]},
+        {"qr": qr[1], "scanned_at": (now - timedelta(days=1)).isoformat()},
+        {"qr": qr[2], "scanned_at": (now + timedelta(seconds=30)).isoformat()},
+        {"qr": qr[3], "scanned_at": (now + timedelta(hours=1)).isoformat()},
+        {"qr": qr[4], "scanned_at": (now - timedelta(days=3)).isoformat()},
+        {"qr": "not-a-qr-code"},
+        {"qr": qr[0]},
+    ]
+    response = await client.post(
+        f"{API}/absensi/scan", json=scans, headers=users["guru"]["headers"]
+    )
+    assert response.status_code == 202, response.text
+    body = response.json()
+
+    statuses = [(item["status"], item.get("detail")) for item in body["results"]]
+    assert statuses == [
+        ("accepted", None),
+        ("accepted", None),
+        ("accepted", None),
+        ("rejected", "scanned_at is in the future"),
+        ("rejected", "scanned_at is too old"),
+        ("rejected", "Unknown QR code"),
+        ("duplicate", None),
+    ]
+    assert [item["index"] for item in body["results"]] == list(range(len(scans)))
+    assert (body["accepted"], body["duplicates"]) == (3, 1)
+    assert body["rejected"] == [qr[3], qr[4], "not-a-qr-code"]
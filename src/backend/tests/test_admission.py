@@ -0,0 +1,43 @@
+"""
+Exports & imports hold their admission slot for the whole response, they get
+limits of their own so the cheap /users routes keep theirs.
+"""
+
+import pytest
+
+from tests.conftest import API
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_busy_exports_leave_reads_alone(client, users, monkeypatch):
+    from app.api import users_export_limit, users_limit
+
+    monkeypatch.setattr(users_export_limit, "queue_size", 0)
+    headers = users["admin"]["headers"]
+    # NOTE: every export slot taken by a slow download
+    for _ in range(users_export_limit.limit):
+        await users_export_limit._semaphore.acquire()
+    try:
+        response = await client.get(f"{API}/users/export", headers=headers)
+        assert response.status_code == 503
+
+        admitted = users_limit.admitted
+        response = await client.get(
+            f"{API}/users/{users['guru']['uuid']}", headers=headers
+        )
+        assert response.status_code == 200
+        response = await client.get(f"{API}/users/", headers=headers)
+        assert response.status_code == 200
+        assert users_limit.admitted == admitted + 2
+    finally:
+        for _ in range(users_export_limit.limit):
+            users_export_limit._semaphore.release()
+
+    exported = users_export_limit.admitted
+    response = await client.get(
+        f"{API}/users/export", params={"role": "admin"}, headers=headers
+    )
+    assert response.status_code == 200
+    assert users_export_limit.admitted == exported + 1
+    assert users_limit.in_flight == 0
@@ -0,0 +1,72 @@
+"""
+Conditional GETs of user resources: the ETag follows `tb_users.version`, a
+revalidation never loads the detail rows.
+"""
+
+import pytest
+
+from tests.conftest import API, login
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_read_user_revalidates(client, users, count_statements):
+    url = f"{API}/users/{users['guru']['uuid']}"
+    headers = users["admin"]["headers"]
+    response = await client.get(url, headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert not etag.startswith("W/")
+    last_modified = response.headers["last-modified"]
+
+    with count_statements() as statements:
+        response = await client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    # NOTE: the principal is cached, one single-table lookup is left
+    assert len(statements) == 1, statements
+    assert "tb_detail_" not in statements[0]
+
+    response = await client.get(
+        url, headers={**headers, "If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 304
+    assert response.headers["last-modified"] == last_modified
+
+
+async def test_same_second_updates_change_the_etag(client, users, seeded):
+    """
+    `updated_at` has second precision, two writes in a row must still give
+    two tags (two versions) so the first one can not revalidate the second
+    body.
+    """
+    username = seeded["guru"][1]
+    guru_headers = await login(client, username)
+    me = await client.get(f"{API}/auth/me", headers=guru_headers)
+    url = f"{API}/users/{me.json()['user_id']}"
+    headers = users["admin"]["headers"]
+
+    etags = []
+    for telp in ("081100000001", "081100000002"):
+        guru = {**me.json()["guru"], "telp": telp}
+        response = await client.put(url, json={"guru": guru}, headers=headers)
+        assert response.status_code == 200, response.text
+        etags.append(response.headers["etag"])
+    assert etags[0] != etags[1]
+
+    response = await client.get(url, headers={**headers, "If-None-Match": etags[0]})
+    assert response.status_code == 200
+    assert response.json()["guru"]["telp"] == "081100000002"
+    assert response.headers["etag"] == etags[1]
+
+    response = await client.get(
+        f"{API}/auth/me", headers={**guru_headers, "If-None-Match": me.headers["etag"]}
+    )
+    assert response.status_code == 200
+    assert response.json()["guru"]["telp"] == "081100000002"
+
+    response = await client.get(
+        f"{API}/auth/me",
+        headers={**guru_headers, "If-None-Match": response.headers["etag"]},
+    )
+    assert response.status_code == 304
@@ -0,0 +1,36 @@
+"""
+`GET /data-umum/kelas`: cached catalogue and conditional GETs.
+"""
+
+import pytest
+
+from tests.conftest import API
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_kelas_order_and_etag(client):
+    from app.api.endpoints_v1.datum_api import kelas_cache
+
+    asc = await client.get(f"{API}/data-umum/kelas")
+    desc = await client.get(f"{API}/data-umum/kelas", params={"order_by": "desc"})
+    assert asc.status_code == desc.status_code == 200
+    names = [kelas["kelas"] for kelas in asc.json()]
+    assert names == sorted(names)
+    assert [kelas["kelas"] for kelas in desc.json()] == names[::-1]
+
+    response = await client.get(
+        f"{API}/data-umum/kelas", headers={"If-None-Match": asc.headers["ETag"]}
+    )
+    assert response.status_code == 304
+    assert len(kelas_cache) == 2
+
+
+@pytest.mark.parametrize("order_by", ["", "ASC", "random", "asc;drop"])
+async def test_kelas_rejects_unknown_order(client, order_by):
+    from app.api.endpoints_v1.datum_api import kelas_cache
+
+    size = len(kelas_cache)
+    response = await client.get(f"{API}/data-umum/kelas", params={"order_by": order_by})
+    assert response.status_code == 422
+    assert len(kelas_cache) == size
@@ -0,0 +1,60 @@
+"""
+Login rate limits: per client & username, plus a looser one per client.
+The client address comes from X-Forwarded-For only behind a trusted proxy.
+"""
+
+import pytest
+
+from tests.conftest import API
+
+pytestmark = pytest.mark.anyio
+
+
+async def attempt(client, username: str, address: str = None) -> int:
+    headers = {"X-Forwarded-For": f"203.0.113.9, {address}"} if address else {}
+    response = await client.post(
+        f"{API}/auth/login",
+        data={"username": username, "password": "wrong"},
+        headers=headers,
+    )
+    return response.status_code
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    """
+    The benchmark settings disable the limits, tighten them for a test. The
+    in-process client connects from 127.0.0.1, trusted as the proxy.
+    """
+    from app.api import login_ip_rate, login_rate
+    from app.core import settings
+
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", ["127.0.0.1"])
+    for limit, burst in ((login_rate, 3), (login_ip_rate, 6)):
+        monkeypatch.setattr(limit, "burst", burst)
+        monkeypatch.setattr(limit, "rate", 1 / 60)
+
+
+async def test_one_client_can_not_lock_out_an_account(client, limits):
+    guesses = [await attempt(client, "rate-limited", "10.0.0.1") for _ in range(3)]
+    assert guesses == [401] * 3
+    assert await attempt(client, " Rate-Limited", "10.0.0.1") == 429
+
+    # NOTE: the owner of the account, somewhere else
+    assert await attempt(client, "rate-limited", "10.0.0.2") == 401
+
+
+async def test_one_client_many_usernames(client, limits):
+    statuses = [await attempt(client, f"spray-{n}", "10.0.0.3") for n in range(6)]
+    assert statuses == [401] * 6
+    assert await attempt(client, "spray-6", "10.0.0.3") == 429
+    assert await attempt(client, "spray-6", "10.0.0.4") == 401
+
+
+async def test_forwarded_for_needs_a_trusted_proxy(client, limits, monkeypatch):
+    from app.core import settings
+
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", [])
+    # NOTE: a made up address per request must not buy a fresh bucket
+    statuses = [await attempt(client, "spoofer", f"10.1.0.{n}") for n in range(4)]
+    assert statuses == [401, 401, 401, 429]
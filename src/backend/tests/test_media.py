@@ -0,0 +1,43 @@
+"""
+`GET /media/{kind}/{name}`: only for logged in users, never publicly cached.
+"""
+
+import os
+import secrets
+
+import pytest
+
+from tests.conftest import API
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def photo():
+    from app.core import settings
+
+    name = f"{secrets.token_hex(16)}.png"
+    os.makedirs(os.path.join(settings.MEDIA_ROOT, "photos"), exist_ok=True)
+    path = os.path.join(settings.MEDIA_ROOT, "photos", name)
+    with open(path, "wb") as file:
+        file.write(b"\x89PNG\r\n\x1a\n" + secrets.token_bytes(64))
+    yield name
+    os.remove(path)
+
+
+async def test_read_media_needs_a_user(client, users, photo):
+    url = f"{API}/media/photos/{photo}"
+    response = await client.get(url)
+    assert response.status_code == 401
+
+    headers = users["siswa"]["headers"]
+    response = await client.get(url, headers=headers)
+    assert response.status_code == 200
+    cache_control = response.headers["cache-control"]
+    assert cache_control.startswith("private,")
+    assert "public" not in cache_control
+
+    etag = response.headers["etag"]
+    response = await client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["cache-control"] == cache_control
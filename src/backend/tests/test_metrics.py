@@ -0,0 +1,24 @@
+"""
+Per-route metrics are labelled with the matched route template.
+"""
+
+import pytest
+
+from tests.conftest import API
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_route_labels(client, users):
+    from app.core.metrics import UNMATCHED_ROUTE, route_metrics
+
+    headers = users["admin"]["headers"]
+    await client.get(f"{API}/users/{users['guru']['uuid']}", headers=headers)
+    # NOTE: the `kind` value repeats a literal segment of the path
+    await client.get(f"{API}/media/media/users", headers=headers)
+    await client.get(f"{API}/no-such-route/{users['guru']['uuid']}")
+
+    assert ("GET", f"{API}/users/{{user_id}}") in route_metrics
+    assert ("GET", f"{API}/media/{{kind}}/{{name}}") in route_metrics
+    assert ("GET", UNMATCHED_ROUTE) in route_metrics
+    assert not [route for _, route in route_metrics if users["guru"]["uuid"] in route]
@@ -0,0 +1,56 @@
+"""
+Refresh token rotation: one token family per login, reuse ends only that one.
+"""
+
+import pytest
+
+from benchmarks.http_bench import PASSWORD
+from tests.conftest import API
+
+pytestmark = pytest.mark.anyio
+
+
+async def login_tokens(client, username: str) -> dict:
+    response = await client.post(
+        f"{API}/auth/login", data={"username": username, "password": PASSWORD}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def refresh(client, refresh_token: str):
+    return await client.post(
+        f"{API}/auth/refresh-token", json={"refresh_token": refresh_token}
+    )
+
+
+async def test_rotation(client, seeded):
+    tokens = await login_tokens(client, seeded["guru"][2])
+    response = await refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200, response.text
+    rotated = response.json()["refresh_token"]
+    assert rotated != tokens["refresh_token"]
+
+    response = await refresh(client, rotated)
+    assert response.status_code == 200, response.text
+
+
+async def test_reuse_revokes_only_its_own_session(client, seeded):
+    username = seeded["guru"][3]
+    laptop = await login_tokens(client, username)
+    phone = await login_tokens(client, username)
+
+    # NOTE: the second login must not look like a replay of the first one
+    response = await refresh(client, laptop["refresh_token"])
+    assert response.status_code == 200, response.text
+    laptop_rotated = response.json()["refresh_token"]
+
+    response = await refresh(client, laptop["refresh_token"])
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Refresh token reuse detected"
+
+    # NOTE: the whole laptop family is gone, the phone is untouched
+    response = await refresh(client, laptop_rotated)
+    assert response.status_code == 401
+    response = await refresh(client, phone["refresh_token"])
+    assert response.status_code == 200, response.text
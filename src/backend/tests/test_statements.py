@@ -0,0 +1,63 @@
+"""
+SQL statements per request of the user endpoints, a relationship that is
+loaded lazily again (N+1) or a detail table joined for every role shows up
+here first.
+"""
+
+import pytest
+
+from tests.conftest import API
+
+pytestmark = pytest.mark.anyio
+
+ROLES = ["admin", "guru", "siswa"]
+
+
+@pytest.mark.parametrize("role", ROLES)
+async def test_read_user(client, users, cold_caches, count_statements, role):
+    with count_statements() as statements:
+        response = await client.get(
+            f"{API}/users/{users[role]['uuid']}", headers=users["admin"]["headers"]
+        )
+    assert response.status_code == 200, response.text
+    assert response.json()["role"] == role
+    # the admin's principal, then the user joined with its detail (& kelas)
+    assert len(statements) == 2, statements
+
+    with count_statements() as statements:
+        response = await client.get(
+            f"{API}/users/{users[role]['uuid']}", headers=users["admin"]["headers"]
+        )
+    assert response.status_code == 200
+    assert len(statements) == 1, statements
+
+
+@pytest.mark.parametrize("role", ROLES)
+async def test_read_me(client, users, cold_caches, count_statements, role):
+    with count_statements() as statements:
+        response = await client.get(f"{API}/auth/me", headers=users[role]["headers"])
+    assert response.status_code == 200, response.text
+    assert response.json()["role"] == role
+    assert role in response.json()
+    assert len(statements) == 1, statements
+
+    # NOTE: the principal is cached now, /auth/me is served without SQL
+    with count_statements() as statements:
+        response = await client.get(f"{API}/auth/me", headers=users[role]["headers"])
+    assert response.status_code == 200
+    assert statements == []
+
+
+@pytest.mark.parametrize("role", [None, *ROLES])
+async def test_read_users(client, users, cold_caches, count_statements, role):
+    params = {"limit": 100, **({"role": role} if role else {})}
+    with count_statements() as statements:
+        response = await client.get(
+            f"{API}/users/", params=params, headers=users["admin"]["headers"]
+        )
+    assert response.status_code == 200, response.text
+    assert response.json()
+    assert all(user["role"] == (role or user["role"]) for user in response.json())
+    # the admin's principal, then one statement for the whole page whatever
+    # the roles on it
+    assert len(statements) == 2, statements
@@ -0,0 +1,131 @@
+"""
+`receive_upload`: the multipart body is streamed to a temp file, refused as
+soon as it is too big and never leaves the temp file behind on an error.
+"""
+
+import hashlib
+import os
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+BOUNDARY = "test-boundary"
+MULTIPART = f"multipart/form-data; boundary={BOUNDARY}"
+
+
+def multipart_body(name: str, content: bytes) -> bytes:
+    return (
+        (
+            f"--{BOUNDARY}\r\n"
+            f'Content-Disposition: form-data; name="{name}"; filename="photo.png"\r\n'
+            "Content-Type: image/png\r\n\r\n"
+        ).encode()
+        + content
+        + f"\r\n--{BOUNDARY}--\r\n".encode()
+    )
+
+
+def streamed_request(body: bytes, content_type: str = MULTIPART, chunk: int = 1024):
+    """
+    A request whose body arrives in `chunk` sized messages, `received` counts
+    the ones the parser asked for.
+    """
+    from starlette.requests import Request
+
+    chunks = [body[i : i + chunk] for i in range(0, len(body), chunk)] or [b""]
+    received: list[int] = []
+
+    async def receive():
+        n = len(received)
+        received.append(n)
+        return {
+            "type": "http.request",
+            "body": chunks[n],
+            "more_body": n + 1 < len(chunks),
+        }
+
+    headers = [(b"content-type", content_type.encode())] if content_type else []
+    scope = {"type": "http", "method": "POST", "path": "/", "headers": headers}
+    return Request(scope, receive), received, len(chunks)
+
+
+@pytest.fixture
+def tmp_files():
+    """
+    Names in `MEDIA_ROOT/tmp` left by the test.
+    """
+    from app.core.media import media_directory
+
+    directory = media_directory("tmp")
+    before = set(os.listdir(directory))
+    return lambda: set(os.listdir(directory)) - before
+
+
+async def test_receive_upload(tmp_files):
+    from app.core.uploads import receive_upload
+
+    content = os.urandom(5000)
+    request, _, _ = streamed_request(multipart_body("file", content))
+    upload = await receive_upload(request, field="file", max_bytes=len(content))
+    with open(upload.path, "rb") as file:
+        assert file.read() == content
+    assert upload.sha256 == hashlib.sha256(content).hexdigest()
+    assert (upload.filename, upload.size) == ("photo.png", len(content))
+
+    upload.discard()
+    assert tmp_files() == set()
+
+
+async def test_oversize_upload_is_refused_mid_stream(tmp_files):
+    from fastapi import HTTPException
+    from app.core.uploads import receive_upload
+
+    request, received, total = streamed_request(
+        multipart_body("file", os.urandom(64 * 1024))
+    )
+    with pytest.raises(HTTPException) as error:
+        await receive_upload(request, field="file", max_bytes=4096)
+    assert error.value.status_code == 413
+    assert len(received) < total / 4
+    assert tmp_files() == set()
+
+
+@pytest.mark.parametrize(
+    "content_type",
+    [None, "application/json", "multipart/form-data"],
+    ids=["missing", "not-multipart", "no-boundary"],
+)
+async def test_content_type(tmp_files, content_type):
+    from fastapi import HTTPException
+    from app.core.uploads import receive_upload
+
+    request, received, _ = streamed_request(
+        multipart_body("file", b"content"), content_type=content_type
+    )
+    with pytest.raises(HTTPException) as error:
+        await receive_upload(request, field="file", max_bytes=4096)
+    assert error.value.status_code == 415
+    assert received == []
+    assert tmp_files() == set()
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        multipart_body("other", b"content"),
+        multipart_body("file", b""),
+        # NOTE: broken after the first chunks of the file are on disk
+        multipart_body("file", os.urandom(3000))[:-4] + b"\r\nbroken header\r\n\r\n",
+    ],
+    ids=["other-field", "empty-file", "malformed"],
+)
+async def test_bad_body_leaves_no_temp_file(tmp_files, body):
+    from fastapi import HTTPException
+    from app.core.uploads import receive_upload
+
+    request, _, _ = streamed_request(body)
+    with pytest.raises(HTTPException) as error:
+        await receive_upload(request, field="file", max_bytes=4096)
+    assert error.value.status_code == 400
+    assert tmp_files() == set()
@@ -0,0 +1,154 @@
+"""
+`GET /users/export`: role filtered exports and flat memory while streaming.
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from tests.conftest import API
+
+pytestmark = pytest.mark.anyio
+
+EXPORT_ROWS = 200_000
+# NOTE: the 200k users, their ORM objects and rows would be several hundred MB
+# if the export was built in memory
+EXPORT_RSS_LIMIT = 64 * 1024 * 1024
+
+
+async def count_users(role=None) -> int:
+    from app.db.crud.user_crud import ROLE_DETAILS
+    from app.db.engine import engine
+    from app.models.user_model import UserModel
+
+    stmt = select(func.count()).select_from(UserModel)
+    if role:
+        stmt = stmt.filter(UserModel.role == ROLE_DETAILS[role][1])
+    async with engine.connect() as conn:
+        return await conn.scalar(stmt)
+
+
+def parse_export(response) -> list[dict]:
+    if response.headers["content-type"].startswith("text/csv"):
+        return list(csv.DictReader(io.StringIO(response.text)))
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.mark.parametrize("export_format", ["ndjson", "csv"])
+@pytest.mark.parametrize("role", [None, "admin", "guru", "siswa"])
+async def test_export_by_role(client, users, role, export_format):
+    params = {"format": export_format, **({"role": role} if role else {})}
+    response = await client.get(
+        f"{API}/users/export", params=params, headers=users["admin"]["headers"]
+    )
+    assert response.status_code == 200, response.text
+
+    rows = parse_export(response)
+    assert len(rows) == await count_users(role)
+    assert {row["role"] for row in rows} == (
+        {role} if role else {"admin", "guru", "siswa"}
+    )
+    siswa = [row for row in rows if row["role"] == "siswa"]
+    assert all(row["kelas"] for row in siswa)
+    assert all(row["agama"] for row in rows)
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+@pytest.fixture(scope="module")
+async def many_siswa(seeded):
+    """
+    `EXPORT_ROWS` extra siswa for this module, removed again afterwards.
+    """
+    from benchmarks.seed import CHUNK_SIZE, seed_database
+    from app.db.engine import engine
+    from app.models.user_model import UserDetailSiswa, UserModel
+
+    async with engine.connect() as conn:
+        last_id = await conn.scalar(select(func.max(UserModel.id)))
+    await seed_database(
+        argparse.Namespace(
+            siswa=EXPORT_ROWS,
+            guru=0,
+            admin=0,
+            rombel=1,
+            login_ratio=0,
+            password="export",
+            seed=7,
+            chunk_size=CHUNK_SIZE,
+            reset=False,
+        )
+    )
+    yield EXPORT_ROWS
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            delete(UserDetailSiswa).filter(UserDetailSiswa.user_id > last_id)
+        )
+        await conn.execute(delete(UserModel).filter(UserModel.id > last_id))
+
+
+@pytest.mark.skipif(
+    not os.path.exists("/proc/self/statm"), reason="RSS is read from /proc"
+)
+@pytest.mark.parametrize("export_format", ["ndjson", "csv"])
+async def test_export_memory_stays_flat(client, users, many_siswa, export_format):
+    from app import app
+
+    # NOTE: httpx's ASGI transport collects the whole body, the app is called
+    # directly and every chunk is dropped as soon as it is counted
+    headers = users["admin"]["headers"]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("test", 80),
+        "client": ("127.0.0.1", 50000),
+        "root_path": "",
+        "path": f"{API}/users/export",
+        "raw_path": f"{API}/users/export".encode(),
+        "query_string": f"role=siswa&format={export_format}".encode(),
+        "headers": [(b"authorization", headers["Authorization"].encode())],
+    }
+    stats = {"status": None, "lines": 0, "chunks": 0}
+    baseline = peak = rss_bytes()
+
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if request_sent:
+            # NOTE: the client never disconnects
+            await asyncio.Event().wait()
+        request_sent = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal peak
+        if message["type"] == "http.response.start":
+            stats["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            stats["lines"] += message.get("body", b"").count(b"\n")
+            stats["chunks"] += 1
+            peak = max(peak, rss_bytes())
+
+    await app(scope, receive, send)
+
+    assert stats["status"] == 200
+    header = 1 if export_format == "csv" else 0
+    assert stats["lines"] - header >= many_siswa
+    assert stats["chunks"] > 10
+    assert (
+        peak - baseline < EXPORT_RSS_LIMIT
+    ), f"RSS grew by {(peak - baseline) / 2**20:.1f} MB while streaming"
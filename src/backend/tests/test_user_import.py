@@ -0,0 +1,138 @@
+"""
+Bulk import: per-row report, concurrent duplicates and the hashing lane.
+"""
+
+import asyncio
+import io
+
+import pytest
+
+from tests.conftest import API
+
+pytestmark = pytest.mark.anyio
+
+
+def siswa_row(username: str) -> dict:
+    return {
+        "username": username,
+        "password": "import",
+        "full_name": f"siswa {username}",
+        "role": "siswa",
+        "is_active": True,
+        "siswa": {
+            "gender": "laki-laki",
+            "tempat_lahir": None,
+            "tgl_lahir": None,
+            "agama": None,
+            "nama_ortu": None,
+            "alamat": None,
+            "telp": None,
+            "kelas_id": 1,
+        },
+    }
+
+
+async def test_import_report(client, users, seeded):
+    taken = seeded["siswa"][1][0]
+    rows = [siswa_row("imp-0001"), siswa_row(taken), siswa_row("imp-0001"), {}]
+    response = await client.post(
+        f"{API}/users/import", json=rows, headers=users["admin"]["headers"]
+    )
+    assert response.status_code == 200, response.text
+    statuses = [item["status"] for item in response.json()["results"]]
+    assert statuses == ["created", "conflict", "conflict", "invalid"]
+
+
+async def test_import_file_csv(client, users):
+    content = (
+        "username,password,full_name,role,gender,kelas_id\n"
+        "imp-csv-1,import,Siswa Satu,siswa,perempuan,1\n"
+        "imp-csv-2,import,Siswa Dua,siswa,laki-laki,999\n"
+    )
+    response = await client.post(
+        f"{API}/users/import-file",
+        files={"file": ("users.csv", io.BytesIO(content.encode()), "text/csv")},
+        headers=users["admin"]["headers"],
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["summary"] == {"created": 1, "invalid": 1}
+
+
+async def test_import_concurrent_duplicate(client, users, monkeypatch):
+    """
+    A username created by someone else between the set-based check and the
+    INSERT is reported per row, the rest of the chunk is still created.
+    """
+    from sqlalchemy import insert
+    from app.core.security import password_hasher
+    from app.db.engine import engine
+    from app.models.user_model import RoleEnum, UserModel
+
+    hash_many = password_hasher.hash_many
+
+    async def racing_hash_many(passwords):
+        hashes = await hash_many(passwords)
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(UserModel).values(
+                    username="imp-race-2",
+                    hashed_password=hashes[0],
+                    full_name="elsewhere",
+                    role=RoleEnum.siwsa,
+                    is_active=True,
+                )
+            )
+        return hashes
+
+    monkeypatch.setattr(password_hasher, "hash_many", racing_hash_many)
+    rows = [siswa_row(f"imp-race-{n}") for n in range(1, 4)]
+    response = await client.post(
+        f"{API}/users/import", json=rows, headers=users["admin"]["headers"]
+    )
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert [item["status"] for item in results] == ["created", "conflict", "created"]
+    assert "already exists" in results[1]["detail"]
+
+
+async def test_bulk_hashing_leaves_slots_for_logins(client):
+    from app.core.security import password_hasher
+
+    bulk_concurrency = password_hasher.bulk_concurrency
+    assert bulk_concurrency < password_hasher.max_concurrency
+    # NOTE: a few rounds of the bulk lane, longer than the login below
+    size = 4 * bulk_concurrency
+    bulk = asyncio.create_task(password_hasher.hash_many(["import"] * size))
+    await asyncio.sleep(0.05)
+    assert password_hasher.in_flight == bulk_concurrency
+    assert password_hasher.bulk_queue_depth == size - bulk_concurrency
+
+    # NOTE: a login verifies next to the import instead of behind it
+    hashed = await password_hasher.hash("login")
+    assert await password_hasher.verify("login", hashed)
+    assert not bulk.done()
+    assert len(await bulk) == size
+
+
+async def test_import_hashes_without_a_connection(client, users, monkeypatch):
+    from app.core import settings
+    from app.core.security import password_hasher
+    from app.db.engine import engine
+
+    if settings.PASSWORD_HASH_BULK_CONCURRENCY is None:
+        assert password_hasher.bulk_concurrency == max(password_hasher.workers - 1, 1)
+
+    hash_many = password_hasher.hash_many
+    checked_out: list[int] = []
+
+    async def watched_hash_many(passwords):
+        checked_out.append(engine.sync_engine.pool.checkedout())
+        return await hash_many(passwords)
+
+    monkeypatch.setattr(password_hasher, "hash_many", watched_hash_many)
+    rows = [siswa_row(f"imp-pool-{n}") for n in range(3)]
+    response = await client.post(
+        f"{API}/users/import", json=rows, headers=users["admin"]["headers"]
+    )
+    assert response.status_code == 200, response.text
+    assert checked_out == [0]
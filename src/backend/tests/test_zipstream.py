@@ -0,0 +1,45 @@
+"""
+`stream_zip`: a streamed archive opens with `zipfile` and keeps every file
+intact, also one larger than a chunk.
+"""
+
+import io
+import os
+import zipfile
+import zlib
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_stream_zip(tmp_path):
+    from app.core.zipstream import CHUNK_SIZE, stream_zip
+
+    contents = {
+        "photos/a.png": os.urandom(1000),
+        "photos/empty.png": b"",
+        "idcards/big.png": os.urandom(2 * CHUNK_SIZE + 123),
+    }
+    paths = {}
+    for n, (arcname, content) in enumerate(contents.items()):
+        paths[arcname] = tmp_path / f"{n}.bin"
+        paths[arcname].write_bytes(content)
+
+    async def entries():
+        for arcname, path in paths.items():
+            yield arcname, str(path)
+
+    chunks = [chunk async for chunk in stream_zip(entries())]
+    # NOTE: one chunk of one file at a time, never the whole big file
+    assert max(len(chunk) for chunk in chunks) < CHUNK_SIZE + 1024
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == list(contents)
+        for arcname, content in contents.items():
+            info = archive.getinfo(arcname)
+            assert info.compress_type == zipfile.ZIP_STORED
+            assert info.file_size == len(content)
+            assert info.CRC == zlib.crc32(content)
+            assert archive.read(arcname) == content